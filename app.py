@@ -6,39 +6,1954 @@ import plotly.graph_objects as go
 from datetime import datetime
 from htmltools import css
 from shinywidgets import output_widget, render_widget
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+import functools
+import glob
+import hashlib
+import io
+import itertools
+import json
+import logging
 import os
+import pickle
+import re
+import shutil
+import sqlite3
+import threading
+import time
 
-# Read the CSV file
-def load_data(file_path=None):
-    if file_path is not None:
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+# Data shown at startup: a station CSV, or a Feather file written by ingest.py
+DEFAULT_DATA_PATH = os.environ.get("SANGAMURA_DATA_PATH", "data/w771dz_sangamura_20240901-20240930.csv")
+
+# Typed Feather copies of ingested CSVs, named by the CSV's content hash
+SIDECAR_DIR = os.environ.get("SANGAMURA_SIDECAR_DIR", os.path.join("data", ".cache"))
+
+# Points sent per time-series trace, roughly the pixel width of a chart
+PLOT_MAX_POINTS = int(os.environ.get("SANGAMURA_PLOT_POINTS", "1500"))
+
+# Series panels over more raw samples than this render with WebGL (Scattergl) instead of SVG
+WEBGL_MIN_POINTS = int(os.environ.get("SANGAMURA_WEBGL_POINTS", "5000"))
+
+# Memory budget for serialized figures shared between sessions
+FIGURE_CACHE_BUDGET = int(os.environ.get("SANGAMURA_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+# Rows parsed per chunk during CSV ingestion, bounding the parser's working set
+CSV_CHUNK_ROWS = int(os.environ.get("SANGAMURA_CSV_CHUNK_ROWS", "100000"))
+
+# Drop the raw date/time strings and dictionary-encode text columns once parsed
+COMPACT_STORAGE = os.environ.get("SANGAMURA_COMPACT_STORAGE", "1") != "0"
+
+NUMERIC_COLS = ['temperature', 'humidity', 'light', 'rainfall_5min', 
+                'rainfall_1hour', 'wind_speed', 'atmospheric_pressure']
+
+# Time every reactive calc, effect and render, and expose the numbers (opt-in)
+DIAGNOSTICS = os.environ.get("SANGAMURA_DIAGNOSTICS", "0") == "1"
+
+# Largest number of rows one API range query may return
+API_MAX_ROWS = int(os.environ.get("SANGAMURA_API_MAX_ROWS", "1000000"))
+
+# Directory of monthly station CSVs to serve as one lazily loaded archive (optional)
+ARCHIVE_DIR = os.environ.get("SANGAMURA_ARCHIVE_DIR")
+
+# Seconds between checks of the active data file for appended readings; 0 disables live tail mode
+LIVE_TAIL_SECONDS = float(os.environ.get("SANGAMURA_LIVE_TAIL_SECONDS", "0"))
+
+# SQLite database persisting readings per station across restarts (optional). When set,
+# uploads are upserted into it.
+STORE_PATH = os.environ.get("SANGAMURA_STORE_PATH")
+
+# Serve the dashboard and API from the store's month windows instead of the default data or
+# archive. Only for stores loaded with the station's full history (e.g. by uploading it).
+STORE_PRIMARY = os.environ.get("SANGAMURA_STORE_PRIMARY", "0") == "1"
+
+# Directory of memory-mapped dataset generations published by `ingest.py --publish` (optional).
+# Worker processes map the current generation read-only instead of each parsing their own copy.
+SHARED_DIR = os.environ.get("SANGAMURA_SHARED_DIR")
+
+# Seconds between checks for a newly published shared generation
+SHARED_POLL_SECONDS = float(os.environ.get("SANGAMURA_SHARED_POLL_SECONDS", "10"))
+
+# Station whose readings the dashboard shows from the store
+STATION_ID = os.environ.get("SANGAMURA_STATION", os.path.basename(DEFAULT_DATA_PATH).split('_')[0])
+
+# Loaded archive windows kept per archive, least recently used evicted first
+ARCHIVE_CACHE_WINDOWS = int(os.environ.get("SANGAMURA_ARCHIVE_CACHE_WINDOWS", "6"))
+
+# Memory budget for the process-wide dataset cache shared by all sessions
+DATASET_CACHE_BUDGET = int(os.environ.get("SANGAMURA_CACHE_BUDGET_MB", "512")) * 1024 * 1024
+
+# Worker threads parsing uploads off the event loop, shared by all sessions
+INGEST_WORKERS = int(os.environ.get("SANGAMURA_INGEST_WORKERS", "2"))
+
+# Worker processes for bulk ingestion of many station files
+INGEST_PROCESSES = int(os.environ.get("SANGAMURA_INGEST_PROCESSES", str(os.cpu_count() or 1)))
+
+# Seconds between checks of a background upload's progress
+INGEST_POLL_SECONDS = 0.25
+
+# Sessions share cached frames, so copy-on-write keeps one session's edits from leaking into another.
+# pandas 3 always copies on write and warns when the option is set.
+if int(pd.__version__.split('.')[0]) < 3:
+    try:
+        pd.set_option("mode.copy_on_write", True)
+    except KeyError:
+        pass  # pandas before 1.5 has no copy-on-write
+
+# (abspath, mtime, size) -> Dataset, least recently used first
+_dataset_cache = OrderedDict()
+_dataset_cache_lock = threading.Lock()
+_dataset_load_locks = {}
+
+diagnostics_log = logging.getLogger("sangamura.diagnostics")
+
+_metrics_lock = threading.Lock()
+_process_metrics = {}  # callback name -> totals across all sessions
+_session_metrics = {}  # session id -> {callback name -> totals}
+
+def _record_metric(metrics, name, elapsed_ms, serialize_ms, payload_bytes):
+    entry = metrics.get(name)
+    if entry is None:
+        entry = metrics[name] = {'runs': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'serialize_ms': 0.0, 'payload_bytes': 0}
+    entry['runs'] += 1
+    entry['total_ms'] += elapsed_ms
+    entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+    entry['serialize_ms'] += serialize_ms
+    entry['payload_bytes'] += payload_bytes
+
+# Serialized size of a render result, and the time it took to serialize it
+def _payload_size(result):
+    if result is None:
+        return 0.0, 0
+    start = time.perf_counter()
+    if hasattr(result, 'to_json'):
+        payload = result.to_json()
+    else:
+        payload = str(result)
+    return (time.perf_counter() - start) * 1000, len(payload.encode('utf-8'))
+
+# Wrap a reactive callback so each run (one per invalidation) is timed and its output
+# measured. A no-op unless SANGAMURA_DIAGNOSTICS=1.
+def instrumented(name, session_id=None, measure_payload=False):
+    def decorator(fn):
+        if not DIAGNOSTICS:
+            return fn
+        
+        # Runs that raise, including Shiny's silent req() exceptions, are recorded too
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            return_value = None
+            completed = False
+            try:
+                return_value = fn(*args, **kwargs)
+                completed = True
+            finally:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                measured = measure_payload and completed
+                serialize_ms, payload_bytes = _payload_size(return_value) if measured else (0.0, 0)
+                with _metrics_lock:
+                    _record_metric(_process_metrics, name, elapsed_ms, serialize_ms, payload_bytes)
+                    if session_id is not None:
+                        _record_metric(_session_metrics.setdefault(session_id, {}), name, elapsed_ms, serialize_ms, payload_bytes)
+                diagnostics_log.info(json.dumps({
+                    'callback': name,
+                    'session': session_id,
+                    'ms': round(elapsed_ms, 3),
+                    'serialize_ms': round(serialize_ms, 3),
+                    'payload_bytes': payload_bytes,
+                    'completed': completed
+                }))
+            return return_value
+        return wrapper
+    return decorator
+
+def forget_session_metrics(session_id):
+    with _metrics_lock:
+        _session_metrics.pop(session_id, None)
+
+# Snapshot of all recorded timings, with per-session totals
+def diagnostics_report():
+    with _metrics_lock:
+        sessions = {
+            session_id: {
+                'callbacks': {name: dict(entry) for name, entry in metrics.items()},
+                'total_ms': sum(entry['total_ms'] for entry in metrics.values()),
+                'payload_bytes': sum(entry['payload_bytes'] for entry in metrics.values())
+            }
+            for session_id, metrics in _session_metrics.items()
+        }
+        report = {
+            'process': {name: dict(entry) for name, entry in _process_metrics.items()},
+            'sessions': sessions
+        }
+    report['dataset_cache_bytes'] = {name: int(size) for name, size in cache_memory_report().items()}
+    return report
+
+# Station 'YYYY/MM/DD' + 'HH:MM' columns to datetime64[ns] without building the
+# concatenated strings: each distinct date and time is parsed once and the pair
+# combined in int64 nanoseconds. Gives exactly what parsing "date time" strings gives.
+def _parse_date_time(dates, times):
+    date_codes, date_values = pd.factorize(dates)
+    time_codes, time_values = pd.factorize(times)
+    
+    day_ns = pd.to_datetime(pd.Series(date_values, dtype=object), format='%Y/%m/%d').to_numpy(dtype='datetime64[ns]').view('int64')
+    clock = pd.to_datetime(pd.Series(time_values, dtype=object), format='%H:%M')
+    time_ns = (clock - pd.Timestamp('1900-01-01')).to_numpy(dtype='timedelta64[ns]').view('int64')
+    
+    values = np.full(len(dates), np.iinfo(np.int64).min)  # NaT where either part is missing
+    present = (date_codes >= 0) & (time_codes >= 0)
+    values[present] = day_ns[date_codes[present]] + time_ns[time_codes[present]]
+    return pd.Series(values.view('datetime64[ns]'), index=dates.index)
+
+# Parse the date/time columns and coerce one chunk of CSV rows to compact dtypes
+def _parse_chunk(df):
+    if 'date' in df.columns and 'time' in df.columns:
+        try:
+            df['datetime'] = _parse_date_time(df['date'], df['time'])
+        except (TypeError, ValueError):
+            # Let the generic parser produce the usual error for malformed values
+            df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%Y/%m/%d %H:%M')
+    else:
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        
+    df = df.replace('', np.nan)
+    
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    # Text columns are dictionary-encoded once the chunks are stitched together, so that
+    # every chunk of a file agrees on which columns are categorical
+    return _typed_frame(df, compact_text=False)
+
+# Column types shared by fresh CSV parses and sidecar loads so both paths agree
+def _typed_frame(df, compact_text=True):
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    if 'wind_direction' in df.columns:
+        df['wind_direction'] = _string_categories(df['wind_direction'].astype('category'))
+    if COMPACT_STORAGE:
+        df = _compact_frame(df, compact_text)
+    return df
+
+# Plain text column: object, or pandas' dedicated string dtype (the default text dtype from pandas 3)
+def _is_text(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return False
+    return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+
+# Drop what parsing made redundant and dictionary-encode repetitive text columns
+def _compact_frame(df, text=True):
+    if 'datetime' in df.columns:
+        df = df.drop(columns=[col for col in ('date', 'time') if col in df.columns])
+    if text:
+        for col in df.columns:
+            if _is_text(df[col].dtype) and df[col].nunique() <= max(len(df) // 2, 1):
+                df[col] = df[col].astype('category')
+    return df
+
+# Sensor readings are stored as float32; these give the shortest decimal that round-trips,
+# so a reading of 15.8 shows and serializes as 15.8 rather than 15.800000190734863
+def reading(value):
+    return float(str(np.float32(value)))
+
+# Sensors repeat a few hundred distinct readings, so each distinct one is formatted only once
+def readings(values):
+    distinct, inverse = np.unique(np.asarray(values, dtype=np.float32), return_inverse=True)
+    return distinct.astype(str).astype(np.float64)[inverse.reshape(-1)]
+
+# Categorical with text categories; a column with no values at all infers float categories,
+# which union_categoricals() refuses to combine with the text ones of other chunks
+def _string_categories(values):
+    categories = values.cat.categories
+    if categories.dtype != object:
+        values = values.cat.rename_categories(categories.astype(str).astype(object))
+    return values
+
+# Stitch frames together, keeping categorical columns categorical. A column that is categorical
+# in any frame (a compacted file next to rows it has not seen yet, say) is encoded in all of them.
+def _concat_chunks(chunks):
+    chunks = [chunk.copy(deep=False) for chunk in chunks]  # Callers may pass shared frames
+    columns = dict.fromkeys(col for chunk in chunks for col in chunk.columns)
+    for col in columns:
+        present = [chunk for chunk in chunks if col in chunk.columns]
+        if not any(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in present):
+            continue
+        for chunk in present:
+            chunk[col] = _string_categories(chunk[col].astype('category'))
+        categories = pd.api.types.union_categoricals(
+            [chunk[col].cat.remove_unused_categories() for chunk in present]
+        ).categories
+        for chunk in present:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+# Parse a CSV file into a dashboard frame, CSV_CHUNK_ROWS rows at a time.
+# progress(bytes_read, total_bytes) is called after every chunk.
+def _parse_data(file_path, progress=None):
+    try:
+        total = os.path.getsize(file_path)
+        f = open(file_path, 'rb')
+    except OSError as e:
+        return None, f"Error loading file: {str(e)}"
+    
+    chunks = []
+    rows = 0
+    with f:
+        try:
+            reader = pd.read_csv(f, chunksize=CSV_CHUNK_ROWS)
+            for chunk in reader:
+                # Check the schema on the first chunk rather than after reading the whole file
+                if not chunks and 'datetime' not in chunk.columns and not ('date' in chunk.columns and 'time' in chunk.columns):
+                    return None, "CSV must have either 'datetime' column or 'date' and 'time' columns"
+                
+                try:
+                    chunks.append(_parse_chunk(chunk))
+                except Exception as e:
+                    return None, f"Error processing file near row {rows + 1}: {str(e)}"
+                rows += len(chunk)
+                
+                if progress is not None:
+                    progress(f.tell(), total)
+        except Exception as e:
+            return None, f"Error loading file: {str(e)}"
+    
+    if not chunks:
+        return None, "Error loading file: no data rows"
+    try:
+        df = _concat_chunks(chunks)
+        return (_compact_frame(df) if COMPACT_STORAGE else df), None
+    except Exception as e:
+        return None, f"Error processing file: {str(e)}"
+
+def _file_digest(file_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _sidecar_path(file_path, digest):
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(SIDECAR_DIR, f"{stem}.{digest}.feather")
+
+def _read_sidecar(sidecar):
+    # Uncompressed Feather memory-maps, so numeric columns come back without a parse
+    table = feather.read_table(sidecar, memory_map=True)
+    return _typed_frame(table.to_pandas(split_blocks=True))
+
+def _write_sidecar(df, file_path, sidecar):
+    os.makedirs(SIDECAR_DIR, exist_ok=True)
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp, compression='uncompressed')
+    os.replace(tmp, sidecar)
+    
+    # Older sidecars of the same source are stale once its content changes
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    for old in glob.glob(os.path.join(glob.escape(SIDECAR_DIR), f"{glob.escape(stem)}.*.feather")):
+        if old != sidecar:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+# Load a CSV through its columnar sidecar, writing the sidecar on first ingest.
+# Feather files written by bulk_ingest() are read directly.
+def _ingest_data(file_path, progress=None):
+    if file_path.endswith('.feather'):
+        if feather is None:
+            return None, "Reading Feather files needs pyarrow installed"
         try:
-            df = pd.read_csv(file_path)
+            return _read_sidecar(file_path), None
         except Exception as e:
             return None, f"Error loading file: {str(e)}"
+    
+    if feather is None:
+        return _parse_data(file_path, progress)
+    
+    try:
+        sidecar = _sidecar_path(file_path, _file_digest(file_path))
+    except OSError as e:
+        return None, f"Error loading file: {str(e)}"
+    
+    if os.path.exists(sidecar):
+        try:
+            return _read_sidecar(sidecar), None
+        except Exception:
+            pass  # Unreadable sidecar, rebuild it from the CSV
+    
+    df, error = _parse_data(file_path, progress)
+    if df is None:
+        return None, error
+    
+    try:
+        _write_sidecar(df, file_path, sidecar)
+    except Exception:
+        pass  # The cache is an optimisation; a read-only data dir must not break loading
+    return df, None
+
+# (frame, error) for each path, parsed across up to `processes` worker processes.
+# Each worker also writes the file's sidecar, so later loads skip the CSV. Forking is only
+# safe from a single-threaded process, so this is for ingest.py, not the running server.
+def ingest_files(paths, processes=None):
+    paths = list(paths)
+    processes = min(processes or INGEST_PROCESSES, len(paths))
+    if processes <= 1:
+        return [_ingest_data(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_ingest_data, paths))
+
+# Concatenate frames in time order. Where files overlap (exports repeating the readings at a
+# month boundary) the later file's reading wins, so every timestamp appears once.
+def _merge_frames(frames):
+    frames = sorted(frames, key=lambda df: df['datetime'].min())
+    df = _concat_chunks(frames)
+    df = df.take(np.argsort(df['datetime'].to_numpy(), kind='stable'))
+    duplicate = df['datetime'].duplicated(keep='last') & df['datetime'].notna()
+    return df[~duplicate.to_numpy()].reset_index(drop=True)
+
+# Parse many station files in parallel into one time-ordered frame, optionally written to
+# `output` as Feather, which load_data() reads without parsing. Returns (frame, error).
+def bulk_ingest(paths, output=None, processes=None):
+    paths = sorted(paths)
+    if not paths:
+        return None, "No files to ingest"
+    
+    frames = []
+    for path, (df, error) in zip(paths, ingest_files(paths, processes)):
+        if df is None:
+            return None, f"{os.path.basename(path)}: {error}"
+        frames.append(df)
+    
+    try:
+        df = _merge_frames(frames)
+    except Exception as e:
+        return None, f"Error merging files: {str(e)}"
+    
+    if output is not None:
+        if feather is None:
+            return None, "Writing Feather files needs pyarrow installed"
+        tmp = f"{output}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(df, tmp, compression='uncompressed')
+            os.replace(tmp, output)
+        except Exception as e:
+            return None, f"Error writing {output}: {str(e)}"
+    return df, None
+
+STAT_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+_dataset_versions = itertools.count(1)
+
+# Distinguishes datasets built in this process from those of other workers or earlier runs
+_process_token = os.urandom(6).hex()
+
+# Sorted-position slice [lo, hi) of timestamps covering an x-axis range, padded by one sample each side
+def _window(timestamps, x_range=None):
+    if x_range is None:
+        return 0, len(timestamps)
+    lo = int(timestamps.searchsorted(pd.Timestamp(x_range[0]).value)) - 1
+    hi = int(timestamps.searchsorted(pd.Timestamp(x_range[1]).value, side='right')) + 1
+    return max(lo, 0), min(hi, len(timestamps))
+
+# Rollup levels, finest first, as numpy datetime64 units
+ROLLUP_LEVELS = [('hourly', 'h'), ('daily', 'D'), ('monthly', 'M')]
+
+# Aggregates kept per column at every rollup level
+ROLLUP_AGGS = {
+    'temperature': ('mean', 'min', 'max'),
+    'humidity': ('mean', 'min', 'max'),
+    'light': ('mean', 'min', 'max'),
+    'atmospheric_pressure': ('mean', 'min', 'max'),
+    'rainfall_5min': ('sum',),
+    'rainfall_1hour': ('mean', 'max'),
+    'wind_speed': ('mean', 'max')
+}
+
+# Compass bearing each wind_direction label points at
+DIRECTION_ANGLES = {
+    'north': 0,
+    'northeast': 45,
+    'east': 90,
+    'southeast': 135,
+    'south': 180,
+    'southwest': 225,
+    'west': 270,
+    'northwest': 315
+}
+
+WIND_DIRECTIONS = list(DIRECTION_ANGLES)
+WIND_DIRECTION_LABELS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+
+# Lower edges (m/s) of the wind rose speed bins; the last bin is open-ended
+WIND_SPEED_BINS = [0, 1, 2, 4, 6, 8]
+
+# Wind rose histograms kept per dataset
+WIND_ROSE_CACHE_SIZE = 32
+
+# [start, end) of the wind rose period containing day: the day itself, the week
+# ending on it, or its calendar month
+def wind_rose_window(day, period):
+    day = pd.Timestamp(day).normalize()
+    if period == 'week':
+        return day - pd.Timedelta(days=6), day + pd.Timedelta(days=1)
+    if period == 'month':
+        start = day.replace(day=1)
+        return start, start + pd.offsets.MonthBegin(1)
+    return day, day + pd.Timedelta(days=1)
+
+# Direction x speed-bin sample counts between two timestamps
+def wind_histogram(ds, start, end):
+    lo, hi = ds.calendar().span(start, end)
+    directions = ds.sorted_directions()[lo:hi]
+    speed = ds.sorted_values('wind_speed')[lo:hi]
+    
+    valid = (directions >= 0) & np.isfinite(speed)
+    speed_bins = np.digitize(speed[valid], WIND_SPEED_BINS[1:])
+    cells = directions[valid].astype(np.int64) * len(WIND_SPEED_BINS) + speed_bins
+    counts = np.bincount(cells, minlength=len(WIND_DIRECTIONS) * len(WIND_SPEED_BINS))
+    return counts.reshape(len(WIND_DIRECTIONS), len(WIND_SPEED_BINS))
+
+DAY_NS = 24 * 60 * 60 * 10**9
+
+# Per-date index over sorted timestamps: each date's [lo, hi) sorted-position range and its
+# HH:MM time slots, so day views are plain slices of the sorted arrays. With previous (the
+# calendar of a version these timestamps extend) only its last day onwards is indexed again.
+class Calendar:
+    def __init__(self, timestamps, previous=None):
+        lo = 0 if previous is None else int(previous.bounds[-2])  # Start of the last, possibly partial, day
+        days = timestamps[lo:] - timestamps[lo:] % DAY_NS
+        starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+        self.days = days[starts]
+        self.bounds = np.r_[lo + starts, len(timestamps)]
+        self._times = {}
+        if previous is not None:
+            self.days = np.concatenate([previous.days[:-1], self.days])
+            self.bounds = np.concatenate([previous.bounds[:-2], self.bounds])
+            self._times = {day: times for day, times in previous._times.items() if day.value < previous.days[-1]}
+        self.nbytes = self.days.nbytes + self.bounds.nbytes
+        self._timestamps = timestamps
+        self._day_positions = {int(day): i for i, day in enumerate(self.days)}
+    
+    # Sorted-position range of one date; empty when the date has no readings
+    def day_range(self, day):
+        i = self._day_positions.get(pd.Timestamp(day).normalize().value)
+        if i is None:
+            return 0, 0
+        return int(self.bounds[i]), int(self.bounds[i + 1])
+    
+    # Sorted-position range of [start, end); day-aligned bounds are looked up without
+    # touching the timestamps
+    def span(self, start, end):
+        positions = []
+        for t in (pd.Timestamp(start).value, pd.Timestamp(end).value):
+            i = int(self.days.searchsorted(t))
+            if t % DAY_NS == 0 or i == 0:
+                positions.append(int(self.bounds[i]))
+            else:
+                positions.append(int(self._timestamps.searchsorted(t)))
+        return positions[0], positions[1]
+    
+    # The date with readings closest to day: day itself unless the station was down then
+    def nearest_day(self, day):
+        t = pd.Timestamp(day).normalize().value
+        i = int(self.days.searchsorted(t))
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(self.days)]
+        return pd.Timestamp(int(self.days[min(candidates, key=lambda j: abs(int(self.days[j]) - t))]))
+    
+    # Sorted HH:MM strings of the readings on one date
+    def times(self, day):
+        day = pd.Timestamp(day).normalize()
+        times = self._times.get(day)
+        if times is None:
+            lo, hi = self.day_range(day)
+            minutes = (self._timestamps[lo:hi] - day.value) // (60 * 10**9)
+            minutes = minutes[np.r_[True, minutes[1:] != minutes[:-1]]] if len(minutes) else minutes
+            times = [f"{m // 60:02d}:{m % 60:02d}" for m in minutes.tolist()]
+            self._times[day] = times
+        return times
+
+# One aggregation level: bucket start timestamps and float32 (col, agg) -> values
+class Rollup:
+    def __init__(self, name, timestamps, values):
+        self.name = name
+        self.timestamps = timestamps
+        self.values = values
+        self.nbytes = timestamps.nbytes + sum(v.nbytes for v in values.values())
+
+# Aggregate y over the contiguous buckets beginning at starts, ignoring NaN
+def _reduce_buckets(y, starts, aggs):
+    valid = np.isfinite(y)
+    count = np.add.reduceat(valid.astype(np.int64), starts)
+    total = np.add.reduceat(np.where(valid, y, 0.0), starts, dtype=np.float64)
+    
+    out = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for agg in aggs:
+            if agg == 'mean':
+                out[agg] = total / count
+            elif agg == 'sum':
+                out[agg] = np.where(count > 0, total, np.nan)
+            elif agg == 'min':
+                out[agg] = np.fmin.reduceat(y, starts)
+            elif agg == 'max':
+                out[agg] = np.fmax.reduceat(y, starts)
+    return {agg: values.astype(np.float32) for agg, values in out.items()}
+
+# Wind bearing in degrees per sample in timestamp order, NaN where unknown
+def _wind_angles(ds):
+    directions = ds.sorted_directions()
+    return np.where(directions >= 0, directions * 45.0, np.nan)
+
+# Hourly, daily and monthly aggregates of a dataset, built with one reduceat pass per column.
+# With previous (the rollups of a version this dataset extends) only the samples from each
+# level's last, possibly partial, bucket onwards are reduced and appended to it.
+def build_rollups(ds, previous=None):
+    starts_at = [0] * len(ROLLUP_LEVELS)
+    if previous is not None:
+        starts_at = [int(ds.timestamps.searchsorted(level.timestamps[-1])) for level in previous]
+    first = min(starts_at)
+    
+    has_wind = 'wind_speed' in ds.df.columns and 'wind_direction' in ds.df.columns
+    if has_wind:
+        # Vector components of the wind, averaged so opposing directions cancel
+        speed = ds.sorted_values('wind_speed')[first:]
+        radians = np.radians(_wind_angles(ds)[first:])
+        wind_u = speed * np.sin(radians)
+        wind_v = speed * np.cos(radians)
+    
+    levels = []
+    for i, (name, unit) in enumerate(ROLLUP_LEVELS):
+        lo = starts_at[i]
+        keys = ds.timestamps[lo:].view('datetime64[ns]').astype(f'datetime64[{unit}]')
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        
+        values = {}
+        for col, aggs in ROLLUP_AGGS.items():
+            if col in ds.df.columns:
+                for agg, reduced in _reduce_buckets(ds.sorted_values(col)[lo:], starts, aggs).items():
+                    values[(col, agg)] = reduced
+        if has_wind:
+            mean_u = _reduce_buckets(wind_u[lo - first:], starts, ('mean',))['mean']
+            mean_v = _reduce_buckets(wind_v[lo - first:], starts, ('mean',))['mean']
+            values[('wind_speed', 'vector_mean')] = np.hypot(mean_u, mean_v)
+            values[('wind_direction', 'vector_mean')] = (np.degrees(np.arctan2(mean_u, mean_v)) % 360).astype(np.float32)
+        
+        timestamps = keys[starts].astype('datetime64[ns]').view('int64')
+        if previous is not None:
+            timestamps = np.concatenate([previous[i].timestamps[:-1], timestamps])
+            values = {key: np.concatenate([previous[i].values[key][:-1], reduced]) for key, reduced in values.items()}
+        levels.append(Rollup(name, timestamps, values))
+    return levels
+
+# Whole-dataset and per-day statistics, computed once so gauges and axes never rescan columns
+def summarize(df, timestamps):
+    cols = [col for col in NUMERIC_COLS if col in df.columns]
+    values = df[cols].astype('float64')
+    quantiles = values.quantile(STAT_QUANTILES)
+    
+    stats = {}
+    for col in cols:
+        stats[col] = {
+            'min': values[col].min(),
+            'max': values[col].max(),
+            'mean': values[col].mean(),
+            'count': int(values[col].count()),
+            'quantiles': quantiles[col].to_dict()
+        }
+    stats['datetime'] = {
+        'min': pd.Timestamp(timestamps[0]),
+        'max': pd.Timestamp(timestamps[-1]),
+        'count': len(timestamps)
+    }
+    
+    daily_stats = values.groupby(df['datetime'].dt.normalize()).agg(['min', 'max', 'mean', 'count'])
+    return stats, daily_stats
+
+# (min, max, mean, count) of two disjoint sets of values from those of each; takes scalars or
+# aligned Series
+def _merge_moments(old_min, old_max, old_mean, old_count, new_min, new_max, new_mean, new_count):
+    count = old_count + new_count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (np.nan_to_num(old_mean) * old_count + np.nan_to_num(new_mean) * new_count) / count
+    return np.fmin(old_min, new_min), np.fmax(old_max, new_max), mean, count
+
+# Statistics of two sets of readings taken together, from the summarize() stats of each.
+# Quantiles cannot be combined this way and are left out.
+def combine_stats(stats, other):
+    combined = {}
+    for col in dict.fromkeys([*stats, *other]):
+        first, second = stats.get(col), other.get(col)
+        if col == 'datetime':
+            continue
+        if first is None or second is None:
+            combined[col] = {key: value for key, value in (first or second).items() if key != 'quantiles'}
+            continue
+        mn, mx, mean, count = _merge_moments(first['min'], first['max'], first['mean'], first['count'],
+                                             second['min'], second['max'], second['mean'], second['count'])
+        combined[col] = {'min': mn, 'max': mx, 'mean': float(mean) if count else np.nan, 'count': int(count)}
+    combined['datetime'] = {
+        'min': min(stats['datetime']['min'], other['datetime']['min']),
+        'max': max(stats['datetime']['max'], other['datetime']['max']),
+        'count': stats['datetime']['count'] + other['datetime']['count']
+    }
+    return combined
+
+# (stats, daily_stats) after appending new_df, merged from the existing summary and one of the
+# new rows alone. Quantiles stay those of the last full summarize().
+def merge_summary(stats, daily_stats, new_df, timestamps):
+    new_stats, new_daily = summarize(new_df, timestamps[-1:])
+    
+    merged = {}
+    for col, old in stats.items():
+        new = new_stats.get(col)
+        if col == 'datetime' or new is None:
+            merged[col] = old
+            continue
+        mn, mx, mean, count = _merge_moments(old['min'], old['max'], old['mean'], old['count'],
+                                             new['min'], new['max'], new['mean'], new['count'])
+        merged[col] = {'min': mn, 'max': mx, 'mean': float(mean) if count else np.nan,
+                       'count': int(count), 'quantiles': old['quantiles']}
+    merged['datetime'] = {
+        'min': stats['datetime']['min'],
+        'max': pd.Timestamp(timestamps[-1]),
+        'count': len(timestamps)
+    }
+    
+    # New rows come after the existing ones, so only the last existing day can overlap
+    overlap = new_daily.index.intersection(daily_stats.index)
+    combined = daily_stats.loc[overlap].copy()
+    for col in combined.columns.get_level_values(0).unique():
+        if col not in new_daily.columns.get_level_values(0):
+            continue
+        old, new = daily_stats.loc[overlap, col], new_daily.loc[overlap, col]
+        (combined[(col, 'min')], combined[(col, 'max')],
+         combined[(col, 'mean')], combined[(col, 'count')]) = _merge_moments(
+            old['min'], old['max'], old['mean'], old['count'],
+            new['min'], new['max'], new['mean'], new['count'])
+    daily = pd.concat([daily_stats.drop(overlap), combined, new_daily.drop(overlap)])
+    return merged, daily
+
+# A numeric column as a float array with NaN for missing values, without copying float columns
+def _float_values(column):
+    dtype = column.dtype if column.dtype in (np.float32, np.float64) else np.float64
+    return column.to_numpy(dtype=dtype, na_value=np.nan, copy=False)
+
+# Index into WIND_DIRECTIONS per row of a wind_direction column, -1 where missing or unrecognised
+def _direction_indices(directions):
+    if not isinstance(directions.dtype, pd.CategoricalDtype):
+        directions = directions.astype('category')
+    index_by_code = np.array(
+        [WIND_DIRECTIONS.index(str(c).lower()) if str(c).lower() in DIRECTION_ANGLES else -1
+         for c in directions.cat.categories] + [-1],
+        dtype=np.int8
+    )
+    return index_by_code[directions.cat.codes.to_numpy()]  # Code -1 hits the trailing -1
+
+# A loaded station frame plus the lookup structures built once per dataset
+class Dataset:
+    # order: precomputed timestamp order of df's rows (see extend()).
+    # source: (path, bytes consumed) of the file this dataset was parsed from, for live tailing.
+    # lineage: shared by a dataset and the versions extended from it.
+    # summary: precomputed (stats, daily_stats), e.g. from a shared generation.
+    # presorted: df's rows are already in timestamp order, so the sorted arrays are views of its columns.
+    # identity: names the content across processes and restarts (file key, generation, ...);
+    # without one the dataset is only identified within this process.
+    def __init__(self, df, order=None, source=None, lineage=None, summary=None, presorted=False, identity=None):
+        self.df = df
+        self.source = source
+        self.version = next(_dataset_versions)
+        self.identity = identity or f"{_process_token}.{self.version}"
+        self._root_identity = self.identity  # Of the version first loaded, which extend() builds on
+        self.lineage = self.version if lineage is None else lineage
+        
+        # Sorted int64 nanosecond timestamps; order maps a sorted position back to its row
+        ts = df['datetime'].to_numpy(dtype='datetime64[ns]').view('int64')
+        if order is None:
+            rows = np.flatnonzero(ts != np.iinfo(np.int64).min)  # Skip NaT
+            order = rows[np.argsort(ts[rows], kind='stable')]
+        self.order = order
+        
+        # Rows usually arrive in time order; then the sorted arrays are views of the columns
+        self._presorted = presorted or (
+            len(order) == len(ts) and (len(order) == 0 or (order[0] == 0 and bool((np.diff(order) == 1).all())))
+        )
+        self.timestamps = ts if self._presorted else ts[self.order]
+        if len(self.timestamps) == 0:
+            raise ValueError("no valid date/time values")
+        self.order.flags.writeable = False
+        self.timestamps.flags.writeable = False
+        
+        self.stats, self.daily_stats = summary if summary is not None else summarize(df, self.timestamps)
+        
+        self._frame_nbytes = int(df.memory_usage(deep=True).sum())
+        self._sorted_values = {}
+        self._sorted_directions = None
+        self._rollups = None
+        self._calendar = None
+        self._wind_histograms = OrderedDict()
+    
+    # New version with rows appended after the current last timestamp. Only the new rows are
+    # sorted and summarised; the sorted arrays, rollups and calendar built so far are appended
+    # to rather than rebuilt. The frame itself is still concatenated, a copy per append.
+    def extend(self, new_df, source=None):
+        ts_new = new_df['datetime'].to_numpy(dtype='datetime64[ns]').view('int64')
+        keep = np.flatnonzero(ts_new > self.timestamps[-1])  # Drops NaT and already-seen times
+        if len(keep) == 0:
+            return self
+        
+        new_df = new_df.iloc[keep].reset_index(drop=True)
+        new_order = np.argsort(ts_new[keep], kind='stable')
+        df = _concat_chunks([self.df, new_df])
+        order = np.concatenate([self.order, len(self.df) + new_order])
+        timestamps = np.concatenate([self.timestamps, ts_new[keep][new_order]])
+        summary = merge_summary(self.stats, self.daily_stats, new_df, timestamps)
+        # The loaded file plus how far into it has been read, however many appends led here
+        identity = f"{self._root_identity}+{source[1]:x}" if source is not None else None
+        ds = Dataset(df, order=order, source=source, lineage=self.lineage, summary=summary, identity=identity)
+        ds._root_identity = self._root_identity
+        if self._calendar is not None:
+            ds._calendar = Calendar(ds.timestamps, previous=self._calendar)
+        
+        if list(new_df.columns) != list(self.df.columns):
+            return ds
+        # In-order appends leave the extended dataset presorted, with free views for its sorted values
+        for col, values in ({} if ds._presorted else self._sorted_values).items():
+            appended = _float_values(new_df[col])[new_order].astype(values.dtype)
+            ds._sorted_values[col] = np.concatenate([values, appended])
+            ds._sorted_values[col].flags.writeable = False
+        if self._sorted_directions is not None:
+            appended = _direction_indices(new_df['wind_direction'])[new_order]
+            ds._sorted_directions = np.concatenate([self._sorted_directions, appended])
+            ds._sorted_directions.flags.writeable = False
+        if self._rollups is not None:
+            ds._rollups = build_rollups(ds, previous=self._rollups)
+        return ds
+    
+    # Column values in timestamp order, in the column's own float dtype (float32 once typed),
+    # computed once per dataset; a view of the column when rows are already in order
+    def sorted_values(self, col):
+        values = self._sorted_values.get(col)
+        if values is None:
+            values = _float_values(self.df[col])
+            if not self._presorted:
+                values = values[self.order]
+            values.flags.writeable = False
+            self._sorted_values[col] = values
+        return values
+    
+    # Index into WIND_DIRECTIONS per sample in timestamp order, -1 where missing or unrecognised
+    def sorted_directions(self):
+        if self._sorted_directions is None:
+            values = _direction_indices(self.df['wind_direction'])
+            if not self._presorted:
+                values = values[self.order]
+            values.flags.writeable = False
+            self._sorted_directions = values
+        return self._sorted_directions
+    
+    # Wind rose counts for [start, end), shared by every session viewing the same period
+    def wind_histogram(self, start, end):
+        key = (pd.Timestamp(start), pd.Timestamp(end))
+        counts = self._wind_histograms.get(key)
+        if counts is None:
+            counts = wind_histogram(self, *key)
+            counts.flags.writeable = False
+            self._wind_histograms[key] = counts
+            while len(self._wind_histograms) > WIND_ROSE_CACHE_SIZE:
+                self._wind_histograms.popitem(last=False)
+        return counts
+    
+    # Sorted-position slice [lo, hi) covering an x-axis range, padded by one sample each side
+    def window(self, x_range=None):
+        return _window(self.timestamps, x_range)
+    
+    # Date index over the timestamps, built on first use
+    def calendar(self):
+        if self._calendar is None:
+            self._calendar = Calendar(self.timestamps)
+        return self._calendar
+    
+    # Bytes held by the frame and every derived structure built so far; views of the frame's
+    # columns and of mapped files are free
+    @property
+    def nbytes(self):
+        return int(self._frame_nbytes + self._derived_nbytes().sum())
+    
+    # Bytes held per derived structure, by the same rule as nbytes
+    def _derived_nbytes(self):
+        def owned(values):
+            return values.nbytes if values is not None and values.flags.owndata else 0
+        return pd.Series({
+            '(timestamps)': owned(self.timestamps),
+            '(order)': owned(self.order),
+            '(sorted values)': sum(owned(values) for values in self._sorted_values.values()),
+            '(wind directions)': owned(self._sorted_directions),
+            '(rollups)': sum(level.nbytes for level in self._rollups or []),
+            '(calendar)': self._calendar.nbytes if self._calendar is not None else 0
+        }, dtype='int64')
+    
+    # Bytes held per column and per derived structure
+    def memory_report(self):
+        return pd.concat([self.df.memory_usage(deep=True, index=True), self._derived_nbytes()])
+    
+    # Aggregation levels from hourly to monthly, built on first use
+    def rollups(self):
+        if self._rollups is None:
+            self._rollups = build_rollups(self)
+        return self._rollups
+    
+    # (timestamps, values) of col inside x_range, taken from the coarsest rollup level that
+    # still has at least n_out points there, or from the raw samples
+    def series(self, col, agg='mean', x_range=None, n_out=None):
+        n_out = n_out or PLOT_MAX_POINTS
+        best = None
+        for level in self.rollups():
+            values = level.values.get((col, agg))
+            lo, hi = _window(level.timestamps, x_range)
+            if values is None or hi - lo < n_out:
+                break
+            best = (level.timestamps[lo:hi], values[lo:hi])
+        if best is None:
+            lo, hi = self.window(x_range)
+            best = (self.timestamps[lo:hi], self.sorted_values(col)[lo:hi])
+        return best
+    
+    # Row position of the sample nearest to target, earliest row winning ties like idxmin()
+    def nearest_index(self, target):
+        ts = self.timestamps
+        if len(ts) == 0:
+            return 0
+        t = pd.Timestamp(target).value
+        
+        right = int(ts.searchsorted(t))
+        if right == len(ts):
+            return int(self.order[ts.searchsorted(ts[-1])])
+        if right == 0:
+            return int(self.order[0])
+        
+        left = int(ts.searchsorted(ts[right - 1]))  # First of any run of duplicates
+        before, after = t - int(ts[left]), int(ts[right]) - t
+        if before < after or (before == after and self.order[left] < self.order[right]):
+            return int(self.order[left])
+        return int(self.order[right])
+
+# Largest-Triangle-Three-Buckets: keeps the points that best preserve the visual shape
+def lttb_indices(x, y, n_out):
+    if len(y) <= n_out:
+        return np.arange(len(y))
+    finite = np.flatnonzero(np.isfinite(y))
+    n = len(finite)
+    if n <= n_out or n_out < 3:
+        return finite
+    
+    xs = (x[finite] - x[finite[0]]).astype(np.float64)
+    ys = y[finite].astype(np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            avg_x = xs[end:edges[i + 2]].mean()
+            avg_y = ys[end:edges[i + 2]].mean()
+        else:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        
+        area = np.abs((xs[a] - avg_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y - ys[a]))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return finite[out]
+
+# Min/max bucketing: keeps the extremes of every bucket, so short spikes survive
+def minmax_indices(y, n_out):
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    
+    buckets = max(n_out // 2, 1)
+    size = -(-n // buckets)
+    grid = np.full(buckets * size, np.nan)
+    grid[:n] = y
+    grid = grid.reshape(buckets, size)
+    missing = np.isnan(grid)
+    
+    base = np.arange(buckets) * size
+    lo = base + np.where(missing, np.inf, grid).argmin(axis=1)
+    hi = base + np.where(missing, -np.inf, grid).argmax(axis=1)
+    idx = np.unique(np.concatenate([lo, hi]))
+    idx = idx[idx < n]
+    return idx[np.isfinite(y[idx])]
+
+# Timestamp-ordered (x, y) for a column at the coarsest adequate resolution, reduced to about n_out points
+def downsample_series(ds, col, method='lttb', x_range=None, n_out=None):
+    n_out = n_out or PLOT_MAX_POINTS
+    # Bucket maxima keep peaks for min/max sampling; LTTB works on bucket means
+    x, y = ds.series(col, 'max' if method == 'minmax' else 'mean', x_range, n_out)
+    if method == 'minmax':
+        idx = minmax_indices(y, n_out)
     else:
-        default_path = "data/w771dz_sangamura_20240901-20240930.csv"
-        if not os.path.exists(default_path):
-            return None, f"Default data file not found at {default_path}"
-        df = pd.read_csv(default_path)
+        idx = lttb_indices(x, y, n_out)
+    return x[idx].view('datetime64[ns]'), y[idx]
+
+# Re-fetch the visible window at full resolution whenever the user zooms or pans.
+# Returns refresh(ds), which re-samples the current view from a newer version of the dataset.
+def resample_on_zoom(fig, ds, col, method='lttb', trace=0):
+    state = {'ds': ds, 'window': ds.window()}
+    
+    def _resample(*_):
+        xaxis = fig.layout.xaxis
+        x_range = None if xaxis.autorange or xaxis.range is None else xaxis.range
+        window = state['ds'].window(x_range)
+        if window == state['window']:
+            return
+        state['window'] = window
+        
+        x, y = downsample_series(state['ds'], col, method, x_range)
+        with fig.batch_update():
+            fig.data[trace].x = x
+            fig.data[trace].y = y
+    
+    def refresh(new_ds):
+        state['ds'] = new_ds
+        _resample()
+    
+    fig.layout.on_change(_resample, 'xaxis.range', 'xaxis.autorange')
+    return refresh
+
+_figure_cache = OrderedDict()  # key -> figure JSON, least recently used first
+_figure_cache_bytes = 0
+_figure_cache_lock = threading.Lock()
+
+# Figure for key, built by build() only when no session has built it yet. Figures are
+# kept as JSON and rehydrated without re-running Plotly's property validation.
+def cached_figure(key, build, widget=False):
+    global _figure_cache_bytes
+    with _figure_cache_lock:
+        payload = _figure_cache.get(key)
+        if payload is not None:
+            _figure_cache.move_to_end(key)
+    
+    if payload is None:
+        payload = build().to_json()
+        with _figure_cache_lock:
+            if key not in _figure_cache:
+                _figure_cache[key] = payload
+                _figure_cache_bytes += len(payload)
+            while _figure_cache_bytes > FIGURE_CACHE_BUDGET and len(_figure_cache) > 1:
+                _, evicted = _figure_cache.popitem(last=False)
+                _figure_cache_bytes -= len(evicted)
+    
+    # Skipping validation also skips the widget's change tracking, so widgets are rebuilt from
+    # a static figure; otherwise marker moves and zoom re-sampling never reach the browser
+    fig = go.Figure(json.loads(payload), _validate=False)
+    return go.FigureWidget(fig) if widget else fig
+
+# Hidden "Selected" marker trace, positioned by update_selected_marker(). It takes the
+# trace type of the series it sits on, so WebGL charts keep it in the same layer.
+def selected_marker(with_text=False, trace_type=go.Scatter):
+    return trace_type(
+        x=[],
+        y=[],
+        mode='markers+text' if with_text else 'markers',
+        marker=dict(
+            color='red',
+            size=12
+        ),
+        textposition='top center',
+        textfont=dict(size=14, color='red'),
+        name='Selected',
+        visible=False
+    )
+
+# Move the "Selected" marker to row idx; only this one-point trace is re-sent to the client
+def update_selected_marker(fig, df, idx, col, text_col=None):
+    marker = next(fig.select_traces(selector=dict(name='Selected')), None)
+    if marker is None:
+        return
+    value = df[col].iat[idx]
+    if pd.isna(value):
+        marker.visible = False
+        return
+    
+    with fig.batch_update():
+        marker.x = [df['datetime'].iat[idx]]
+        marker.y = [reading(value)]
+        if text_col is not None:
+            text = df[text_col].iat[idx]
+            marker.text = [text if not pd.isna(text) else '']
+        marker.visible = True
+
+def _dataset_key(file_path):
+    st = os.stat(file_path)
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+# Content identity of a dataset loaded from the file version behind key
+def _key_identity(key):
+    path, mtime_ns, size = key
+    return f"{path}:{mtime_ns:x}:{size:x}"
+
+def _store_dataset(key, ds):
+    with _dataset_cache_lock:
+        # A changed file gets a new key; drop the stale versions of the same path
+        for stale in [k for k in _dataset_cache if k[0] == key[0] and k != key]:
+            del _dataset_cache[stale]
+        _dataset_cache[key] = ds
+        _dataset_cache.move_to_end(key)
+        _enforce_cache_budget()
+
+# Evict cold entries until the cache fits its budget, always keeping the newest. Sizes are
+# taken now rather than when stored, so sorted arrays and rollups built since are counted.
+# Called with _dataset_cache_lock held.
+def _enforce_cache_budget():
+    total = sum(ds.nbytes for ds in _dataset_cache.values())
+    while total > DATASET_CACHE_BUDGET and len(_dataset_cache) > 1:
+        _, evicted = _dataset_cache.popitem(last=False)
+        total -= evicted.nbytes
+
+# Bytes held by each cached dataset, most recently used last
+def cache_memory_report():
+    with _dataset_cache_lock:
+        entries = list(_dataset_cache.items())
+    return pd.Series(
+        [int(ds.memory_report().sum()) for _, ds in entries],
+        index=[os.path.basename(key[0]) for key, _ in entries],
+        dtype='int64'
+    )
+
+def _cached_dataset(key):
+    with _dataset_cache_lock:
+        ds = _dataset_cache.get(key)
+        if ds is None:
+            return None
+        _dataset_cache.move_to_end(key)
+        _enforce_cache_budget()
+        return ds
+
+# Newest cached version of a file's dataset, whatever its current size
+def _latest_dataset(path):
+    with _dataset_cache_lock:
+        for key, ds in _dataset_cache.items():
+            if key[0] == path:
+                return ds
+    return None
+
+# Read the CSV file, parsing it at most once per version across all sessions
+@instrumented('load_data')
+def load_data(file_path=None, progress=None):
+    if file_path is None:
+        file_path = DEFAULT_DATA_PATH
+        if not os.path.exists(file_path):
+            return None, f"Default data file not found at {file_path}"
     
     try:
-        if 'date' in df.columns and 'time' in df.columns:
-            df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%Y/%m/%d %H:%M')
-        elif 'datetime' not in df.columns:
-            return None, "CSV must have either 'datetime' column or 'date' and 'time' columns"
+        key = _dataset_key(file_path)
+    except OSError as e:
+        return None, f"Error loading file: {str(e)}"
+    
+    ds = _cached_dataset(key)
+    if ds is not None:
+        return ds, None
+    
+    # Sessions asking for the same file at once wait for a single parse
+    with _dataset_cache_lock:
+        load_lock = _dataset_load_locks.setdefault(key, threading.Lock())
+    try:
+        with load_lock:
+            ds = _cached_dataset(key)
+            if ds is not None:
+                return ds, None
+            
+            df, error = _ingest_data(file_path, progress)
+            if df is None:
+                return None, error
+            try:
+                ds = Dataset(df, source=(key[0], key[2]), identity=_key_identity(key))
+            except Exception as e:
+                return None, f"Error processing file: {str(e)}"
+            _store_dataset(key, ds)
+            return ds, None
+    finally:
+        with _dataset_cache_lock:
+            _dataset_load_locks.pop(key, None)
+
+_ingest_pool = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+
+class IngestCancelled(Exception):
+    pass
+
+# A load_data() call running on the ingest pool. The worker records its progress here, never
+# in reactive state, and gives up at the next chunk boundary once the task is cancelled.
+class IngestTask:
+    def __init__(self, file_path, name=None):
+        self.name = name or os.path.basename(file_path)
+        self.progress = (0, 1)
+        self._cancelled = threading.Event()
+        self._future = _ingest_pool.submit(load_upload, file_path, station_id(self.name), self._report)
+    
+    def _report(self, done, total):
+        if self._cancelled.is_set():
+            raise IngestCancelled(f"Upload of {self.name} was cancelled")
+        self.progress = (done, total)
+    
+    def cancel(self):
+        self._cancelled.set()
+        self._future.cancel()
+    
+    def done(self):
+        return self._future.done()
+    
+    # (Dataset, error) of the finished load
+    def result(self):
+        try:
+            return self._future.result()
+        except Exception as e:
+            return None, f"Error loading file: {str(e)}"
+
+_tail_lock = threading.Lock()
+
+# Newer version of ds with the complete rows appended to its source file since it was read.
+# Only the new bytes are parsed; a truncated or replaced file is reloaded from scratch.
+def tail_data(ds):
+    if ds.source is None:
+        return ds, None
+    path = ds.source[0]
+    
+    with _tail_lock:
+        # Another session may already have picked up these rows
+        latest = _latest_dataset(path)
+        if latest is not None and latest.lineage == ds.lineage and latest.source[1] > ds.source[1]:
+            ds = latest
+        offset = ds.source[1]
+        
+        try:
+            key = _dataset_key(path)
+            if key[2] == offset:
+                return ds, None
+            if key[2] < offset:
+                return load_data(path)
             
-        df = df.replace('', np.nan)
+            with open(path, 'rb') as f:
+                header = f.readline()
+                f.seek(offset)
+                data = f.read(key[2] - offset)
+        except OSError as e:
+            return ds, f"Error reading appended data: {str(e)}"
         
-        numeric_cols = ['temperature', 'humidity', 'light', 'rainfall_5min', 
-                       'rainfall_1hour', 'wind_speed', 'atmospheric_pressure']
+        # Leave a partially written last line for the next poll
+        data = data[:data.rfind(b'\n') + 1]
+        if not data.strip():
+            return ds, None
         
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-        return df, None
+        try:
+            new_rows = _parse_chunk(pd.read_csv(io.BytesIO(header + data)))
+            ds = ds.extend(new_rows, source=(path, offset + len(data)))
+        except Exception as e:
+            return ds, f"Error processing appended data: {str(e)}"
+        
+        _store_dataset(key, ds)
+        return ds, None
+
+# Station exports are named <station>_<site>_<YYYYMMDD>-<YYYYMMDD>.csv
+_PARTITION_NAME = re.compile(r"_(\d{8})-(\d{8})\.csv$")
+
+# Time span (first, last) of one archive file, from its name or else its first and last rows
+def _partition_span(path):
+    match = _PARTITION_NAME.search(os.path.basename(path))
+    if match:
+        first = pd.Timestamp(match.group(1))
+        last = pd.Timestamp(match.group(2)) + pd.Timedelta(days=1) - pd.Timedelta(1)
+        return first, last
+    
+    try:
+        with open(path, 'rb') as f:
+            header = f.readline()
+            first_row = f.readline()
+            f.seek(max(f.tell(), os.fstat(f.fileno()).st_size - 4096))
+            tail = [line for line in f.read().splitlines() if line.strip()]
+        if not first_row.strip() or not tail:
+            return None
+        edges = _parse_chunk(pd.read_csv(io.BytesIO(header + first_row + b'\n' + tail[-1])))
+        return edges['datetime'].min(), edges['datetime'].max()
+    except Exception:
+        return None
+
+# A directory of station CSVs indexed by time span; partitions are parsed only when a window needs them
+class Archive:
+    def __init__(self, directory, mtime=None):
+        self.directory = directory
+        self.mtime = mtime
+        
+        # (first, last, path), sorted by first timestamp
+        self.partitions = []
+        for path in glob.glob(os.path.join(glob.escape(directory), "*.csv")):
+            span = _partition_span(path)
+            if span is not None:
+                self.partitions.append((span[0], span[1], path))
+        self.partitions.sort()
+        
+        self._windows = OrderedDict()
+        self._rows = {}  # _dataset_key() -> row count of a partition file
+        self._lock = threading.Lock()
+    
+    @property
+    def first(self):
+        return self.partitions[0][0]
+    
+    @property
+    def last(self):
+        return max(last for _, last, _ in self.partitions)
+    
+    def covering(self, start, end):
+        return tuple(path for first, last, path in self.partitions if first <= end and last >= start)
+    
+    # Names the current content of every partition
+    @property
+    def identity(self):
+        return "|".join(_key_identity(_dataset_key(path)) for _, _, path in self.partitions)
+    
+    # Rows load_window(start, end) would hold, counted from the partitions' line breaks
+    # without parsing them
+    def count(self, start, end):
+        total = 0
+        for path in self.covering(start, end):
+            key = _dataset_key(path)
+            rows = self._rows.get(key)
+            if rows is None:
+                with open(path, 'rb') as f:
+                    rows = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b'')) - 1  # Header
+                self._rows[key] = rows
+            total += rows
+        return total
+    
+    # Statistics over the whole archive, summarised one partition at a time so the history is
+    # never held in memory at once; readings repeated at partition boundaries count once per file
+    def summary(self):
+        stats = None
+        for _, _, path in self.partitions:
+            part, error = load_data(path)
+            if part is None:
+                return None, error
+            stats = part.stats if stats is None else combine_stats(stats, part.stats)
+        return {col: {key: value for key, value in values.items() if key != 'quantiles'}
+                for col, values in stats.items()}, None
+    
+    # Dataset of the partitions overlapping [start, end], loaded through the shared dataset cache
+    def load_window(self, start, end):
+        paths = self.covering(start, end)
+        if not paths:
+            return None, f"No archive data between {start:%Y-%m-%d} and {end:%Y-%m-%d}"
+        
+        with self._lock:
+            ds = self._windows.get(paths)
+            if ds is not None:
+                self._windows.move_to_end(paths)
+                return ds, None
+        
+        parts = []
+        for path in paths:
+            part, error = load_data(path)
+            if part is None:
+                return None, error
+            parts.append(part)
+        
+        if len(parts) == 1:
+            ds = parts[0]
+        else:
+            try:
+                ds = Dataset(_merge_frames([part.df for part in parts]),
+                             identity="|".join(part.identity for part in parts))
+            except Exception as e:
+                return None, f"Error processing archive: {str(e)}"
+        
+        with self._lock:
+            self._windows[paths] = ds
+            while len(self._windows) > ARCHIVE_CACHE_WINDOWS:
+                self._windows.popitem(last=False)
+        return ds, None
+    
+    # Dataset of the partitions covering one calendar day
+    def load_day(self, day):
+        start = pd.Timestamp(day)
+        return self.load_window(start, start + pd.Timedelta(days=1) - pd.Timedelta(1))
+
+_archive = None
+_archive_lock = threading.Lock()
+
+# The configured archive, rescanned whenever files are added to or removed from its directory
+def get_archive():
+    global _archive
+    if not ARCHIVE_DIR:
+        return None
+    with _archive_lock:
+        try:
+            mtime = os.stat(ARCHIVE_DIR).st_mtime_ns
+        except OSError:
+            return None
+        if _archive is None or _archive.mtime != mtime:
+            archive = Archive(ARCHIVE_DIR, mtime)
+            _archive = archive if archive.partitions else None
+        return _archive
+
+store_log = logging.getLogger("sangamura.store")
+
+# Station id of an export, the leading part of names like w771dz_sangamura_20240901-20240930.csv
+def station_id(file_path):
+    return os.path.basename(file_path).split('_')[0]
+
+# Readings of every station in one SQLite table. The (station, ts) primary key is the time
+# index, so windows and aggregates are answered by index range scans inside SQLite.
+# Exposes the same first/last/load_window/load_day interface as Archive.
+class Store:
+    def __init__(self, path, station):
+        self.path = path
+        self.station = station
+        self.columns = NUMERIC_COLS + ['wind_direction']
+        self._generation = 0  # Bumped by every upsert, invalidating cached windows
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings (station TEXT NOT NULL, ts INTEGER NOT NULL, "
+                + ", ".join(f"{col} REAL" for col in NUMERIC_COLS)
+                + ", wind_direction TEXT, PRIMARY KEY (station, ts)) WITHOUT ROWID"
+            )
+    
+    # A connection per call, committed and closed on exit; sqlite3 connections must not be
+    # shared between threads, and using one as a context manager alone never closes it
+    @contextlib.contextmanager
+    def _connect(self):
+        with contextlib.closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            with conn:
+                yield conn
+    
+    def _bounds(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT MIN(ts), MAX(ts) FROM readings WHERE station = ?", (self.station,)
+            ).fetchone()
+    
+    @property
+    def first(self):
+        return pd.Timestamp(self._bounds()[0])
+    
+    @property
+    def last(self):
+        return pd.Timestamp(self._bounds()[1])
+    
+    @property
+    def empty(self):
+        return self._bounds()[0] is None
+    
+    # Names the database content, for ETags
+    @property
+    def identity(self):
+        return f"store:{self.station}:{self.version}"
+    
+    # Rows load_window(start, end) would hold, counted on the primary key index
+    def count(self, start, end):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM readings WHERE station = ? AND ts BETWEEN ? AND ?",
+                (self.station, pd.Timestamp(start).value, pd.Timestamp(end).value)
+            ).fetchone()[0]
+    
+    # Statistics over the station's whole history, like Dataset.stats without quantiles,
+    # computed in SQLite. Returns (stats, error).
+    def summary(self):
+        selects = ", ".join(f"MIN({col}), MAX({col}), AVG({col}), COUNT({col})" for col in NUMERIC_COLS)
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT MIN(ts), MAX(ts), COUNT(*), {selects} FROM readings WHERE station = ?", (self.station,)
+            ).fetchone()
+        if row[0] is None:
+            return None, f"No stored data for {self.station}"
+        
+        stats = {}
+        for i, col in enumerate(NUMERIC_COLS):
+            mn, mx, mean, count = row[3 + 4 * i:7 + 4 * i]
+            stats[col] = {'min': mn, 'max': mx, 'mean': mean, 'count': count}
+        stats['datetime'] = {'min': pd.Timestamp(row[0]), 'max': pd.Timestamp(row[1]), 'count': row[2]}
+        return stats, None
+    
+    # Insert df's readings for station, replacing any already stored at the same timestamps.
+    # Returns an error message or None.
+    def upsert(self, station, df):
+        columns = [col for col in self.columns if col in df.columns]
+        frame = df[columns].astype(object)
+        frame = frame.where(frame.notna(), None)
+        frame.insert(0, 'ts', df['datetime'].to_numpy(dtype='datetime64[ns]').view('int64').tolist())
+        frame = frame[df['datetime'].notna().to_numpy()]
+        
+        names = ['station', 'ts'] + columns
+        updates = ", ".join(f"{col} = excluded.{col}" for col in columns)
+        sql = (f"INSERT INTO readings ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+               f"ON CONFLICT (station, ts) DO UPDATE SET {updates}")
+        try:
+            with self._connect() as conn:
+                conn.executemany(sql, ((station, *row) for row in frame.itertuples(index=False, name=None)))
+        except sqlite3.Error as e:
+            return f"Error storing readings: {str(e)}"
+        
+        with self._lock:
+            self._generation += 1
+            self._windows.clear()
+        return None
+    
+    # Readings of the station in [start, end] as a dashboard frame
+    def query(self, start, end):
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT ts, {', '.join(self.columns)} FROM readings "
+                "WHERE station = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                conn, params=(self.station, pd.Timestamp(start).value, pd.Timestamp(end).value)
+            )
+        df.insert(0, 'datetime', pd.to_datetime(df.pop('ts'), unit='ns'))
+        return _typed_frame(df)
+    
+    # Changes whenever any process writes to the database, for cache validation
+    @property
+    def version(self):
+        stamps = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                st = os.stat(path)
+                stamps.append(f"{st.st_mtime_ns:x}.{st.st_size:x}")
+            except OSError:
+                pass
+        return "-".join(stamps)
+    
+    # Bucket start per rollup level (see ROLLUP_LEVELS), as SQL over nanosecond ts
+    LEVEL_BUCKETS = {
+        'hourly': f"(ts / {3600 * 10**9}) * {3600 * 10**9}",
+        'daily': f"(ts / {DAY_NS}) * {DAY_NS}",
+        'monthly': f"CAST(strftime('%s', ts / {10**9}, 'unixepoch', 'start of month') AS INTEGER) * {10**9}"
+    }
+    SQL_AGGS = {'mean': 'AVG', 'min': 'MIN', 'max': 'MAX', 'sum': 'SUM'}
+    
+    # Per-bucket aggregates [(col, agg), ...] of the readings in [start, end), computed in SQLite
+    def aggregate(self, start, end, level, columns):
+        selects = ", ".join(f"{self.SQL_AGGS[agg]}({col}) AS \"{col}:{agg}\"" for col, agg in columns)
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                f"SELECT {self.LEVEL_BUCKETS[level]} AS bucket, {selects} FROM readings "
+                "WHERE station = ? AND ts >= ? AND ts < ? GROUP BY bucket ORDER BY bucket",
+                conn, params=(self.station, pd.Timestamp(start).value, pd.Timestamp(end).value)
+            )
+        df.insert(0, 'datetime', pd.to_datetime(df.pop('bucket'), unit='ns'))
+        return df
+    
+    # Dataset of the station's readings in [start, end], shared by the sessions viewing it
+    def load_window(self, start, end):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        version = self.version
+        with self._lock:
+            key = (self._generation, version, start, end)
+            ds = self._windows.get(key)
+            if ds is not None:
+                self._windows.move_to_end(key)
+                return ds, None
+        
+        try:
+            df = self.query(start, end)
+            if len(df) == 0:
+                return None, f"No stored data for {self.station} between {start:%Y-%m-%d} and {end:%Y-%m-%d}"
+            ds = Dataset(df, identity=f"store:{self.station}:{version}:{start.value:x}-{end.value:x}")
+        except Exception as e:
+            return None, f"Error loading stored data: {str(e)}"
+        
+        with self._lock:
+            if key[0] == self._generation:
+                self._windows[key] = ds
+                while len(self._windows) > ARCHIVE_CACHE_WINDOWS:
+                    self._windows.popitem(last=False)
+        return ds, None
+    
+    # Dataset of the calendar month containing day, like an archive's monthly partition
+    def load_day(self, day):
+        start = pd.Timestamp(day).normalize().replace(day=1)
+        return self.load_window(start, start + pd.offsets.MonthBegin(1) - pd.Timedelta(1))
+
+_store = None
+_store_lock = threading.Lock()
+
+# The configured store, or None when no store is configured or it cannot be opened
+def get_store():
+    global _store
+    if not STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = Store(STORE_PATH, STATION_ID)
+            except sqlite3.Error as e:
+                store_log.error("Cannot open store %s: %s", STORE_PATH, e)
+                return None
+        return _store
+
+# Windowed data source for the dashboard: the archive, else the store when it is configured as
+# primary and holds readings, else None. A store that only collects uploads never replaces the
+# default data.
+def get_windowed_source():
+    archive = get_archive()
+    if archive is not None:
+        return archive
+    if not STORE_PRIMARY:
+        return None
+    store = get_store()
+    if store is not None and not store.empty:
+        return store
+    return None
+
+# load_data() for an upload, upserting its readings into the store when one is configured
+def load_upload(file_path, station=None, progress=None):
+    ds, error = load_data(file_path, progress)
+    store = get_store()
+    if ds is not None and store is not None:
+        store_error = store.upsert(station or station_id(file_path), ds.df)
+        if store_error:
+            store_log.warning(store_error)
+    return ds, error
+
+# Shared generations: each is a directory of .npy columns in timestamp order (timestamps,
+# float32 sensors, wind direction codes, and the identity row order so workers map that too)
+# plus the precomputed summary, published once by a loader. CURRENT names the live generation; replacing it swaps every worker over.
+
+# Write ds as a new generation of directory and make it current. Returns (generation, error).
+def publish_shared(ds, directory=None):
+    directory = directory or SHARED_DIR
+    generation = f"gen-{time.time_ns():x}"
+    tmp = os.path.join(directory, f".{generation}.{os.getpid()}.tmp")
+    try:
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'timestamps.npy'), ds.timestamps)
+        np.save(os.path.join(tmp, 'order.npy'), np.arange(len(ds.timestamps)))
+        columns = [col for col in NUMERIC_COLS if col in ds.df.columns]
+        for col in columns:
+            np.save(os.path.join(tmp, f"{col}.npy"), ds.sorted_values(col))
+        has_wind = 'wind_direction' in ds.df.columns
+        if has_wind:
+            np.save(os.path.join(tmp, 'wind_direction.npy'), ds.sorted_directions())
+        with open(os.path.join(tmp, 'meta.pkl'), 'wb') as f:
+            pickle.dump({'columns': columns, 'wind_direction': has_wind,
+                         'summary': (ds.stats, ds.daily_stats)}, f)
+        os.rename(tmp, os.path.join(directory, generation))
+        
+        previous = _current_generation(directory)
+        pointer = os.path.join(directory, 'CURRENT')
+        with open(f"{pointer}.tmp", 'w') as f:
+            f.write(generation)
+        os.replace(f"{pointer}.tmp", pointer)
     except Exception as e:
-        return None, f"Error processing file: {str(e)}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        return None, f"Error publishing shared dataset: {str(e)}"
+    
+    # Keep the generation workers may still be switching away from; mapped files of removed
+    # generations stay readable until every worker drops them
+    for old in glob.glob(os.path.join(glob.escape(directory), "gen-*")):
+        if os.path.basename(old) not in (generation, previous):
+            shutil.rmtree(old, ignore_errors=True)
+    return generation, None
+
+def _current_generation(directory):
+    try:
+        with open(os.path.join(directory, 'CURRENT')) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+# Dataset over a generation's files, memory-mapped read-only
+def _attach_generation(path):
+    with open(os.path.join(path, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+    
+    timestamps = np.load(os.path.join(path, 'timestamps.npy'), mmap_mode='r')
+    columns = {'datetime': timestamps.view('datetime64[ns]')}
+    for col in meta['columns']:
+        columns[col] = np.load(os.path.join(path, f"{col}.npy"), mmap_mode='r')
+    df = pd.DataFrame(columns, copy=False)
+    codes = None
+    if meta['wind_direction']:
+        codes = np.load(os.path.join(path, 'wind_direction.npy'), mmap_mode='r')
+        df['wind_direction'] = pd.Categorical.from_codes(codes, categories=WIND_DIRECTIONS)
+    
+    order_path = os.path.join(path, 'order.npy')
+    if os.path.exists(order_path):
+        order = np.load(order_path, mmap_mode='r')
+    else:
+        order = np.arange(len(timestamps))  # Generations published before order.npy was written
+    ds = Dataset(df, order=order, summary=meta['summary'], presorted=True,
+                 identity=f"shared:{os.path.basename(path)}")
+    # The codes were published as sorted_directions() indices, so the mapped file serves as is
+    if codes is not None:
+        ds._sorted_directions = codes
+    return ds
+
+_shared = {'generation': None, 'ds': None}
+_shared_lock = threading.Lock()
+
+# (Dataset, error) for the current shared generation, attached once per generation
+def shared_dataset():
+    generation = _current_generation(SHARED_DIR)
+    if generation is None:
+        return None, f"No shared dataset published in {SHARED_DIR}"
+    
+    with _shared_lock:
+        if _shared['generation'] == generation:
+            return _shared['ds'], None
+        try:
+            ds = _attach_generation(os.path.join(SHARED_DIR, generation))
+        except Exception as e:
+            return None, f"Error attaching shared dataset: {str(e)}"
+        _shared['generation'], _shared['ds'] = generation, ds
+        return ds, None
+
+# Figure builders, one per dashboard widget. They depend only on their arguments so
+# cached_figure() can share the result between sessions.
+
+# A time-series panel: which column it plots, how it is labelled and how it is downsampled.
+# Adding a sensor to the dashboard takes one entry in SERIES_SPECS.
+class SeriesSpec:
+    def __init__(self, name, tab, column, title, y_label, color, method='lttb', text_col=None):
+        self.name = name          # Output id of the panel
+        self.tab = tab
+        self.column = column
+        self.title = title
+        self.y_label = y_label
+        self.color = color
+        self.method = method      # 'lttb' for smooth signals, 'minmax' to keep spikes
+        self.text_col = text_col  # Categorical column labelled along the series and on the marker
+
+SERIES_SPECS = [
+    SeriesSpec('temperature_plot', 'Temperature', 'temperature', 'Temperature Over Time', 'Temperature (°C)', '#636efa'),
+    SeriesSpec('rainfall_plot', 'Rainfall', 'rainfall_1hour', 'Rainfall (1 hour) Over Time', 'Rainfall (mm)', '#636efa', method='minmax'),
+    SeriesSpec('humidity_plot', 'Humidity', 'humidity', 'Humidity Over Time', 'Humidity (%)', '#636efa'),
+    SeriesSpec('light_plot', 'Light', 'light', 'Light Intensity Over Time', 'Light Intensity', '#636efa'),
+    SeriesSpec('pressure_plot', 'Atmospheric Pressure', 'atmospheric_pressure', 'Atmospheric Pressure Over Time', 'Pressure (hPa)', '#636efa'),
+    SeriesSpec('wind_plot', 'Wind', 'wind_speed', 'Wind Speed and Direction Over Time', 'Wind Speed (m/s)', 'blue', text_col='wind_direction'),
+]
+
+# About 20 evenly spaced text_col labels along the series, skipping missing values
+def _series_labels(ds, spec, trace_type):
+    n = len(ds.timestamps)
+    positions = np.arange(0, n, max(1, n // 20))
+    labels = ds.df[spec.text_col].take(ds.order[positions]).to_numpy()
+    labelled = ~pd.isna(labels)
+    positions = positions[labelled]
+    return trace_type(
+        x=ds.timestamps[positions].view('datetime64[ns]'),
+        y=np.nan_to_num(ds.sorted_values(spec.column)[positions]),
+        text=labels[labelled],
+        mode='markers+text',
+        textposition='top center',
+        marker=dict(
+            symbol='triangle-down',
+            color='white',
+            size=8
+        ),
+        name=spec.text_col.replace('_', ' ').title(),
+        showlegend=False,
+        hoverinfo='skip'
+    )
+
+# Whether series panels of ds render with WebGL. Decided on the raw samples the panel spans, not
+# the PLOT_MAX_POINTS sent to the browser: dense data means constant re-sampling on zoom and pan.
+def webgl_series(ds):
+    return len(ds.timestamps) > WEBGL_MIN_POINTS
+
+# Series figure for spec, built from the downsampled arrays directly. The series is always
+# trace 0 (resample_on_zoom relies on it); the Selected marker starts hidden. Every trace of a
+# dense dataset's panel is WebGL (see webgl_series()).
+def series_figure(ds, spec):
+    x, y = downsample_series(ds, spec.column, method=spec.method)
+    trace_type = go.Scattergl if webgl_series(ds) else go.Scatter
+    traces = [trace_type(
+        x=x,
+        y=y,
+        mode='lines',
+        name=spec.y_label,
+        line=dict(color=spec.color)
+    )]
+    if spec.text_col is not None:
+        traces.append(_series_labels(ds, spec, trace_type))
+    traces.append(selected_marker(with_text=spec.text_col is not None, trace_type=trace_type))
+    
+    return go.Figure(data=traces, layout=dict(
+        title=spec.title,
+        xaxis_title='Date & Time',
+        yaxis_title=spec.y_label,
+        template='plotly_dark',
+        height=500,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor='rgba(0,0,0,0.1)',
+        paper_bgcolor='rgba(0,0,0,0.1)'
+    ))
+
+# Temperature gauge for row idx
+def temperature_gauge_figure(ds, idx):
+    df = ds.df
+    temp = reading(df['temperature'].iat[idx])
+
+    if pd.isna(temp):
+        return go.Figure().update_layout(title="No temperature data available")
+    temp_min = ds.stats['temperature']['min']
+    temp_max = ds.stats['temperature']['max']
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=temp,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Temperature (°C)"},
+        gauge={
+            'axis': {'range': [temp_min - 5, temp_max + 5]},
+            'bar': {'color': "red"},
+            'steps': [
+                {'range': [temp_min - 5, 20], 'color': "blue"},
+                {'range': [20, 25], 'color': "green"},
+                {'range': [25, 30], 'color': "yellow"},
+                {'range': [30, temp_max + 5], 'color': "red"},
+            ]
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=70, b=20),
+        paper_bgcolor='rgba(0,0,0,0.1)'
+    )
+
+    return fig
+
+# Humidity gauge for row idx
+def humidity_gauge_figure(ds, idx):
+    df = ds.df
+    humidity = reading(df['humidity'].iat[idx])
+
+    if pd.isna(humidity):
+        return go.Figure().update_layout(title="No temperature data available")
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=humidity,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Humidity (%)"},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "blue"},
+            'steps': [
+                {'range': [0, 30], 'color': "yellow"},
+                {'range': [30, 70], 'color': "green"},
+                {'range': [70, 100], 'color': "orange"},
+            ]
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor='rgba(0,0,0,0.1)'
+    )
+
+    return fig
+
+# Pressure gauge for row idx
+def pressure_gauge_figure(ds, idx):
+    df = ds.df
+    pressure = reading(df['atmospheric_pressure'].iat[idx])
+
+    if pd.isna(pressure):
+        return go.Figure().update_layout(title="No temperature data available")
+    pressure_min = ds.stats['atmospheric_pressure']['min']
+    pressure_max = ds.stats['atmospheric_pressure']['max']
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=pressure,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Pressure (hPa)"},
+        gauge={
+            'axis': {'range': [pressure_min - 5, pressure_max + 5]},
+            'bar': {'color': "orange"},
+            'steps': [
+                {'range': [pressure_min - 5, 970], 'color': "red"},
+                {'range': [970, 980], 'color': "yellow"},
+                {'range': [980, pressure_max + 5], 'color': "green"},
+            ]
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=70, b=20),
+        paper_bgcolor='rgba(0,0,0,0.1)'
+    )
+
+    return fig
+
+# Wind rose: direction x speed frequencies over the period around row idx
+def wind_rose_figure(ds, idx, period):
+    df = ds.df
+    wind_dir = df['wind_direction'].iat[idx]
+    wind_speed = reading(df['wind_speed'].iat[idx]) if not pd.isna(df['wind_speed'].iat[idx]) else 0
+
+    start, end = wind_rose_window(df['datetime'].iat[idx], period)
+    counts = ds.wind_histogram(start, end)
+    total = counts.sum()
+    frequency = counts * (100.0 / total) if total else counts.astype(float)
+
+    fig = go.Figure()
+
+    # One stacked bar ring per speed bin
+    colors = px.colors.sample_colorscale('Plasma', np.linspace(0.1, 0.9, len(WIND_SPEED_BINS)))
+    for b, low in enumerate(WIND_SPEED_BINS):
+        label = f"{low}-{WIND_SPEED_BINS[b + 1]} m/s" if b + 1 < len(WIND_SPEED_BINS) else f"{low}+ m/s"
+        fig.add_trace(go.Barpolar(
+            r=frequency[:, b],
+            theta=WIND_DIRECTION_LABELS,
+            name=label,
+            marker_color=colors[b]
+        ))
+
+    # Mark the direction the selected reading came from
+    if not pd.isna(wind_dir) and str(wind_dir).lower() in DIRECTION_ANGLES:
+        fig.add_trace(go.Scatterpolar(
+            r=[frequency.sum(axis=1).max() * 1.1 or 1],
+            theta=[WIND_DIRECTION_LABELS[WIND_DIRECTIONS.index(str(wind_dir).lower())]],
+            mode='markers',
+            marker=dict(color='red', size=12, symbol='star'),
+            name='Selected'
+        ))
+
+    fig.update_layout(
+        title=f"Wind: {wind_dir} at {wind_speed} m/s",
+        template='plotly_dark',
+        polar=dict(
+            angularaxis=dict(direction='clockwise', rotation=90),
+            radialaxis=dict(ticksuffix='%', showticklabels=False)
+        ),
+        legend=dict(font=dict(size=10)),
+        height=300,
+        margin=dict(l=20, r=20, t=40, b=20),
+        paper_bgcolor='rgba(0,0,0,0.1)'
+    )
+
+    return fig
 
 # Define UI
 app_ui = ui.page_fluid(
@@ -150,6 +2065,13 @@ app_ui = ui.page_fluid(
                     {"class": "row mt-3"},
                     ui.div(
                         {"class": "col-md-6"},
+                        ui.input_radio_buttons(
+                            "wind_rose_period",
+                            "Wind rose period:",
+                            {"day": "Day", "week": "Week", "month": "Month"},
+                            selected="day",
+                            inline=True
+                        ),
                         output_widget("wind_rose")
                     ),
                     ui.div(
@@ -158,48 +2080,69 @@ app_ui = ui.page_fluid(
                     )
                 )
             ),
-            ui.nav_panel(
-                "Temperature",
-                output_widget("temperature_plot")
-            ),
-            ui.nav_panel(
-                "Rainfall",
-                output_widget("rainfall_plot")
-            ),
-            ui.nav_panel(
-                "Humidity",
-                output_widget("humidity_plot")
-            ),
-            ui.nav_panel(
-                "Light",
-                output_widget("light_plot")
-            ),
-            ui.nav_panel(
-                "Atmospheric Pressure",
-                output_widget("pressure_plot")
-            ),
-            ui.nav_panel(
-                "Wind",
-                output_widget("wind_plot")
-            )
+            *[ui.nav_panel(spec.tab, output_widget(spec.name)) for spec in SERIES_SPECS],
+            *([ui.nav_panel(
+                "Diagnostics",
+                ui.output_ui("diagnostics_panel")
+            )] if DIAGNOSTICS else [])
         )
     )
 )
 
 # Define server
 def server(input, output, session):
+    # Per-session timing of the callbacks below when diagnostics are enabled
+    def timed(name, measure_payload=False):
+        return instrumented(name, session.id, measure_payload)
+    if DIAGNOSTICS:
+        session.on_ended(lambda: forget_session_metrics(session.id))
+    
     rv = reactive.Value(None)
     error_msg = reactive.Value(None)
+    load_progress = reactive.Value(None)
+    
+    # Dataset the session's views were built from; unlike rv it only changes when a
+    # different dataset is loaded, not when live rows are appended to the current one
+    base_rv = reactive.Value(None)
+    
+    # Plot name -> refresh(ds) for the rendered time-series traces
+    series_views = {}
+    
+    # Output id -> FigureWidget of each rendered series panel
+    series_widgets = {}
+
+    uploaded = reactive.Value(False)
+    # Archive or store the session pages through by date, if any
+    archive = get_windowed_source()
 
-    # Initial data load
-    df_init, init_error = load_data()
-    if df_init is not None:
-        rv.set(df_init)
+    # Initial data load; an archive starts on its most recent partition, and workers map the
+    # shared generation when one has been published
+    ds_init = None
+    if archive is not None:
+        ds_init, init_error = archive.load_day(archive.last.normalize())
+    elif SHARED_DIR:
+        ds_init, init_error = shared_dataset()
+    if ds_init is None and archive is None:
+        ds_init, init_error = load_data()
+    if ds_init is not None:
+        rv.set(ds_init)
+        base_rv.set(ds_init)
     else:
         error_msg.set(init_error)
 
+    # Upload being parsed on the ingest pool; a newer upload cancels it
+    upload_task = reactive.Value(None)
+    
+    def cancel_upload():
+        with reactive.isolate():
+            task = upload_task.get()
+        if task is not None:
+            task.cancel()
+    session.on_ended(cancel_upload)
+
     @reactive.Effect
     @reactive.event(input.csv_file)
+    @timed('upload')
     def _():
         # Reset error message
         error_msg.set(None)
@@ -208,69 +2151,196 @@ def server(input, output, session):
         file_info = input.csv_file()
         
         if file_info and file_info[0] is not None:
-            # Load data from uploaded file
-            df_new, new_error = load_data(file_info[0]['datapath'])
-            if df_new is not None:
-                rv.set(df_new)
-                
-                # Update date input
-                min_date = df_new['datetime'].dt.date.min()
-                max_date = df_new['datetime'].dt.date.max()
-                ui.update_date(
-                    "selected_date",
-                    value = min_date,
-                    min = min_date,
-                    max = max_date
-                )
-                
-                # Update time input
-                new_times = [t.strftime('%H:%M') for t in sorted(df_new['datetime'].dt.time.unique())]
-                ui.update_select(
-                    "selected_time",
-                    choices = new_times,
-                    selected = new_times[0] if new_times else None
-                )
-            else:
-                error_msg.set(new_error)
+            # Parse in the background; the session stays responsive meanwhile
+            cancel_upload()
+            task = IngestTask(file_info[0]['datapath'], file_info[0]['name'])
+            upload_task.set(task)
+            load_progress.set(task.progress)
+
+    # Poll the pending upload and swap its dataset in once parsed
+    @reactive.Effect
+    @timed('upload_poll')
+    def _():
+        task = upload_task.get()
+        if task is None:
+            return
+        if not task.done():
+            load_progress.set(task.progress)
+            reactive.invalidate_later(INGEST_POLL_SECONDS)
+            return
+        
+        upload_task.set(None)
+        load_progress.set(None)
+        ds_new, new_error = task.result()
+        if ds_new is not None:
+            # The selectors follow from the dataset change
+            uploaded.set(True)
+            rv.set(ds_new)
+        else:
+            error_msg.set(new_error)
 
-    # Initialize UI date and time selectors
+    # Latest dataset, invalidating callers only when a different dataset is loaded
+    def plot_dataset():
+        base_rv.get()
+        with reactive.isolate():
+            return rv.get()
+
+    # A different dataset re-renders the views; appended rows only re-sample the plotted series,
+    # unless they take it across WEBGL_MIN_POINTS, as a trace's type cannot change in place
+    @reactive.Effect
+    @timed('dataset_change')
+    def _():
+        ds = rv.get()
+        with reactive.isolate():
+            base = base_rv.get()
+        if (ds is not None and base is not None and ds.lineage == base.lineage
+                and webgl_series(ds) == webgl_series(base)):
+            for refresh in series_views.values():
+                refresh(ds)
+            if archive is None or uploaded.get():
+                ui.update_date("selected_date", max = ds.stats['datetime']['max'].date())
+        else:
+            base_rv.set(ds)
+
+    # Swap in a newly published shared generation, unless the session is viewing an upload
+    if SHARED_DIR and archive is None:
+        @reactive.Effect
+        @timed('shared_generation')
+        def _():
+            reactive.invalidate_later(SHARED_POLL_SECONDS)
+            if uploaded.get():
+                return
+            ds_new, _ = shared_dataset()
+            with reactive.isolate():
+                ds = rv.get()
+            if ds_new is not None and ds_new is not ds:
+                error_msg.set(None)
+                rv.set(ds_new)
+
+    # Live tail mode: pick up rows appended to the active data file since the last check
+    if LIVE_TAIL_SECONDS > 0:
+        tail_errors = {'shown': None}
+        
+        @reactive.Effect
+        @timed('live_tail')
+        def _():
+            reactive.invalidate_later(LIVE_TAIL_SECONDS)
+            with reactive.isolate():
+                ds = rv.get()
+            if ds is None:
+                return
+            
+            ds_new, tail_error = tail_data(ds)
+            if tail_error:
+                error_msg.set(tail_error)
+                tail_errors['shown'] = tail_error
+                return
+            
+            # A later successful poll clears the error an earlier one put up
+            if tail_errors['shown'] is not None:
+                with reactive.isolate():
+                    if error_msg.get() == tail_errors['shown']:
+                        error_msg.set(None)
+                tail_errors['shown'] = None
+            if ds_new is not None and ds_new is not ds:
+                rv.set(ds_new)
+
+    # Initialize the date selector for a newly loaded dataset
     @reactive.Effect
+    @timed('date_time_selectors')
     def _():
-        df = rv.get()
-        if df is not None:
-            # Update date input
-            min_date = df['datetime'].dt.date.min()
-            max_date = df['datetime'].dt.date.max()
+        ds = plot_dataset()
+        if ds is not None:
+            # Update date input; an archive window keeps the date the user picked
+            min_date = ds.stats['datetime']['min'].date()
+            max_date = ds.stats['datetime']['max'].date()
+            value = min_date
+            if archive is not None and not uploaded.get():
+                with reactive.isolate():
+                    selected_date = input.selected_date()
+                if selected_date is not None and min_date <= selected_date <= max_date:
+                    value = selected_date
+                min_date, max_date = archive.first.date(), archive.last.date()
             ui.update_date(
                 "selected_date",
-                value = min_date,
+                value = value,
                 min = min_date,
                 max = max_date
             )
-            
-            # Update time input
-            times = [t.strftime('%H:%M') for t in sorted(df['datetime'].dt.time.unique())]
-            ui.update_select(
-                "selected_time",
-                choices = times,
-                selected = times[0] if times else None
-            )
+
+    # Time choices are the slots recorded on the selected date; resent only when they change
+    shown_times = {'times': None}
+    
+    @reactive.Effect
+    @timed('time_selector')
+    def _():
+        ds = rv.get()
+        selected_date = input.selected_date()
+        if ds is None or selected_date is None:
+            return
+        # A date without readings offers the nearest recorded day's slots, so the selection
+        # still lands on the nearest reading rather than emptying the choices
+        calendar = ds.calendar()
+        times = calendar.times(calendar.nearest_day(selected_date))
+        if times == shown_times['times']:
+            return
+        shown_times['times'] = times
+        
+        with reactive.isolate():
+            selected_time = input.selected_time()
+        ui.update_select(
+            "selected_time",
+            choices = times,
+            selected = selected_time if selected_time in times else (times[0] if times else None)
+        )
+
+    # Archive mode: swap in the partition covering a date outside the loaded window
+    @reactive.Effect
+    @reactive.event(input.selected_date)
+    @timed('archive_window')
+    def _():
+        selected_date = input.selected_date()
+        if archive is None or uploaded.get() or selected_date is None:
+            return
+        ds = rv.get()
+        if ds is not None and ds.stats['datetime']['min'].date() <= selected_date <= ds.stats['datetime']['max'].date():
+            return
+        
+        ds_new, new_error = archive.load_day(selected_date)
+        if ds_new is not None:
+            error_msg.set(None)
+            rv.set(ds_new)
+        else:
+            error_msg.set(new_error)
 
     @output
     @render.ui
+    @timed('data_status', measure_payload=True)
     def data_status():
         error = error_msg.get()
+        progress = load_progress.get()
         
         if error:
             return ui.div(
                 {"class": "error-message"},
                 error
             )
+        elif progress is not None:
+            done, total = progress
+            with reactive.isolate():
+                task = upload_task.get()
+            name = f" from {task.name}" if task is not None else ""
+            return ui.div(
+                {"class": "loading-message"},
+                f"Loading data{name}... {100 * done // max(total, 1)}%"
+            )
         elif rv.get() is not None:
-            source = "Uploaded file" if input.file_upload() else "Default data"
+            source = "Uploaded file" if input.csv_file() else "Default data"
+            ds = rv.get()
             return ui.div(
                 {"class": "success-message"},
-                f"Data loaded successfully from {source}"
+                f"Data loaded successfully from {source} "
+                f"({len(ds.df):,} rows, {ds.memory_report().sum() / 2**20:.1f} MB in memory)"
             )
         else:
             return ui.div(
@@ -279,9 +2349,10 @@ def server(input, output, session):
             )
 
     @reactive.Calc
+    @timed('selected_index')
     def selected_index():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return 0
         
         selected_date = input.selected_date()
@@ -293,16 +2364,18 @@ def server(input, output, session):
         datetime_str = f"{selected_date} {selected_time}"
         try:
             target_datetime = pd.to_datetime(datetime_str)
-            return df['datetime'].sub(target_datetime).abs().idxmin()
+            return ds.nearest_index(target_datetime)
         except:
             return 0
 
     @output
     @render.text
+    @timed('selected_datetime', measure_payload=True)
     def selected_datetime():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return "No data available"
+        df = ds.df
         
         # idx = input.datetime_slider()
         idx = selected_index()
@@ -310,23 +2383,25 @@ def server(input, output, session):
     
     @output
     @render.ui
+    @timed('value_boxes', measure_payload=True)
     def value_boxes():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return ui.p("No data available")
+        df = ds.df
 
         # idx = input.datetime_slider()
         idx = selected_index()
         selected_data = df.iloc[idx]
         
-        temperature = selected_data['temperature'] if not pd.isna(selected_data['temperature']) else "N/A"
-        humidity = selected_data['humidity'] if not pd.isna(selected_data['humidity']) else "N/A"
-        light = selected_data['light'] if not pd.isna(selected_data['light']) else "N/A"
-        rainfall_5min = selected_data['rainfall_5min'] if not pd.isna(selected_data['rainfall_5min']) else "N/A"
-        rainfall_1hour = selected_data['rainfall_1hour'] if not pd.isna(selected_data['rainfall_1hour']) else "N/A"
-        wind_speed = selected_data['wind_speed'] if not pd.isna(selected_data['wind_speed']) else "N/A"
+        temperature = reading(selected_data['temperature']) if not pd.isna(selected_data['temperature']) else "N/A"
+        humidity = reading(selected_data['humidity']) if not pd.isna(selected_data['humidity']) else "N/A"
+        light = reading(selected_data['light']) if not pd.isna(selected_data['light']) else "N/A"
+        rainfall_5min = reading(selected_data['rainfall_5min']) if not pd.isna(selected_data['rainfall_5min']) else "N/A"
+        rainfall_1hour = reading(selected_data['rainfall_1hour']) if not pd.isna(selected_data['rainfall_1hour']) else "N/A"
+        wind_speed = reading(selected_data['wind_speed']) if not pd.isna(selected_data['wind_speed']) else "N/A"
         wind_direction = selected_data['wind_direction'] if not pd.isna(selected_data['wind_direction']) else "N/A"
-        pressure = selected_data['atmospheric_pressure'] if not pd.isna(selected_data['atmospheric_pressure']) else "N/A"
+        pressure = reading(selected_data['atmospheric_pressure']) if not pd.isna(selected_data['atmospheric_pressure']) else "N/A"
         
         return ui.div(
             {"class": "row"},
@@ -396,506 +2471,366 @@ def server(input, output, session):
             )
         )
     
-    # Temperature plot
-    @render_widget
-    def temperature_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-
-        fig = px.line(
-            df, 
-            x='datetime', 
-            y='temperature',
-            title='Temperature Over Time',
-            labels={'temperature': 'Temperature (°C)', 'datetime': 'Date & Time'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        # Add marker for selected point
-        # idx = input.datetime_slider()
-        idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_temp = df.iloc[idx]['temperature']
-        
-        if not pd.isna(selected_temp):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_temp],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-        return fig
-    
-    # Rainfall plot
-    @render_widget
-    def rainfall_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-
-        fig = px.line(
-            df, 
-            x='datetime', 
-            y='rainfall_1hour',
-            title='Rainfall (1 hour) Over Time',
-            labels={'rainfall_1hour': 'Rainfall (mm)', 'datetime': 'Date & Time'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        # Add marker for selected point
-        # idx = input.datetime_slider()
-        idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_rain = df.iloc[idx]['rainfall_1hour']
-        
-        if not pd.isna(selected_rain):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_rain],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-        return fig
-    
-    # Humidity plot
-    @render_widget
-    def humidity_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-        
-        fig = px.line(
-            df, 
-            x='datetime', 
-            y='humidity',
-            title='Humidity Over Time',
-            labels={'humidity': 'Humidity (%)', 'datetime': 'Date & Time'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        # Add marker for selected point
-        # idx = input.datetime_slider()
-        idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_humidity = df.iloc[idx]['humidity']
-        
-        if not pd.isna(selected_humidity):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_humidity],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-        return fig
-    
-    # Light plot
-    @render_widget
-    def light_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-
-        fig = px.line(
-            df, 
-            x='datetime', 
-            y='light',
-            title='Light Intensity Over Time',
-            labels={'light': 'Light Intensity', 'datetime': 'Date & Time'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
+    # One widget render per series panel, named after its output id
+    def series_plot(spec):
+        def plot():
+            ds = plot_dataset()
+            if ds is None:
+                return go.Figure().update_layout(title="No data available")
+            
+            fig = cached_figure((ds.version, spec.name), lambda: series_figure(ds, spec), widget=True)
+            series_views[spec.column] = resample_on_zoom(fig, ds, spec.column, method=spec.method)
+            series_widgets[spec.name] = fig
+            
+            # Move the marker to the selected point; later selections move it in place
+            with reactive.isolate():
+                update_selected_marker(fig, ds.df, selected_index(), spec.column, spec.text_col)
+            return fig
         
-        # Add marker for selected point
-        # idx = input.datetime_slider()
-        idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_light = df.iloc[idx]['light']
-        
-        if not pd.isna(selected_light):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_light],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-        return fig
+        plot.__name__ = spec.name
+        return render_widget(timed(spec.name, measure_payload=True)(plot))
     
-    # Pressure plot
-    @render_widget
-    def pressure_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-
-        fig = px.line(
-            df, 
-            x='datetime', 
-            y='atmospheric_pressure',
-            title='Atmospheric Pressure Over Time',
-            labels={'atmospheric_pressure': 'Pressure (hPa)', 'datetime': 'Date & Time'},
-            template='plotly_dark'
-        )
-        fig.update_layout(
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        # Add marker for selected point
-        # idx = input.datetime_slider()
-        idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_pressure = df.iloc[idx]['atmospheric_pressure']
-        
-        if not pd.isna(selected_pressure):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_pressure],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-        return fig
+    for spec in SERIES_SPECS:
+        series_plot(spec)
     
-    # Wind plot
-    @render_widget
-    def wind_plot():
-        df = rv.get()
-        if df is None:
-            return go.Figure().update_layout(title="No data available")
-        
-        fig = go.Figure()
-        
-        # Add wind speed line
-        fig.add_trace(
-            go.Scatter(
-                x=df['datetime'],
-                y=df['wind_speed'],
-                mode='lines',
-                name='Wind Speed (m/s)',
-                line=dict(color='blue')
-            )
-        )
-        
-        # Add annotations for wind direction at regular intervals
-        step = max(1, len(df) // 20)  # Show about 20 directions on the plot
-        for i in range(0, len(df), step):
-            if not pd.isna(df.iloc[i]['wind_direction']):
-                fig.add_annotation(
-                    x=df.iloc[i]['datetime'],
-                    y=df.iloc[i]['wind_speed'] if not pd.isna(df.iloc[i]['wind_speed']) else 0,
-                    text=df.iloc[i]['wind_direction'],
-                    showarrow=True,
-                    arrowhead=2,
-                    ax=0,
-                    ay=-30
-                )
-        
-        # Add marker for selected point
-        # idx = input.datetime_slider()
+    # Selection changes only move the markers on the already-rendered plots
+    @reactive.Effect
+    @timed('selected_markers')
+    def _():
+        ds = rv.get()
+        if ds is None:
+            return
         idx = selected_index()
-        selected_time = df.iloc[idx]['datetime']
-        selected_speed = df.iloc[idx]['wind_speed']
-        
-        if not pd.isna(selected_speed):
-            fig.add_trace(
-                go.Scatter(
-                    x=[selected_time],
-                    y=[selected_speed],
-                    mode='markers',
-                    marker=dict(
-                        color='red',
-                        size=12
-                    ),
-                    name='Selected'
-                )
-            )
-            
-            if not pd.isna(df.iloc[idx]['wind_direction']):
-                fig.add_annotation(
-                    x=selected_time,
-                    y=selected_speed,
-                    text=df.iloc[idx]['wind_direction'],
-                    showarrow=True,
-                    arrowhead=2,
-                    ax=0,
-                    ay=-40,
-                    font=dict(size=14, color="red")
-                )
-        
-        fig.update_layout(
-            title='Wind Speed and Direction Over Time',
-            xaxis_title='Date & Time',
-            yaxis_title='Wind Speed (m/s)',
-            template='plotly_dark',
-            height=500,
-            margin=dict(l=20, r=20, t=40, b=20),
-            plot_bgcolor='rgba(0,0,0,0.1)',
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        return fig
+        # Only rendered panels are in series_widgets; reading a renderer's .widget before it
+        # has rendered raises a silent req() that would end the loop early
+        for spec in SERIES_SPECS:
+            fig = series_widgets.get(spec.name)
+            if fig is not None:
+                update_selected_marker(fig, ds.df, idx, spec.column, spec.text_col)
     
     # Gauge for temperature on All tab
     @render_widget
+    @timed('temperature_gauge', measure_payload=True)
     def temperature_gauge():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return go.Figure().update_layout(title="No data available")
 
         # idx = input.datetime_slider()
         idx = selected_index()
-        temp = df.iloc[idx]['temperature']
-        
-        if pd.isna(temp):
-            return go.Figure().update_layout(title="No temperature data available")
-
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=temp,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Temperature (°C)"},
-            gauge={
-                'axis': {'range': [df['temperature'].min() - 5, df['temperature'].max() + 5]},
-                'bar': {'color': "red"},
-                'steps': [
-                    {'range': [df['temperature'].min() - 5, 20], 'color': "blue"},
-                    {'range': [20, 25], 'color': "green"},
-                    {'range': [25, 30], 'color': "yellow"},
-                    {'range': [30, df['temperature'].max() + 5], 'color': "red"},
-                ]
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=70, b=20),
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
         
-        return fig
+        return cached_figure((ds.version, 'temperature_gauge', idx), lambda: temperature_gauge_figure(ds, idx))
     
     # Gauge for humidity on All tab
     @render_widget
+    @timed('humidity_gauge', measure_payload=True)
     def humidity_gauge():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return go.Figure().update_layout(title="No data available")
-        
+
         # idx = input.datetime_slider()
         idx = selected_index()
-        humidity = df.iloc[idx]['humidity']
-
-        if pd.isna(humidity):
-            return go.Figure().update_layout(title="No temperature data available")
-        
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=humidity,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Humidity (%)"},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': "blue"},
-                'steps': [
-                    {'range': [0, 30], 'color': "yellow"},
-                    {'range': [30, 70], 'color': "green"},
-                    {'range': [70, 100], 'color': "orange"},
-                ]
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
         
-        return fig
+        return cached_figure((ds.version, 'humidity_gauge', idx), lambda: humidity_gauge_figure(ds, idx))
     
     # Gauge for pressure on All tab
     @render_widget
+    @timed('pressure_gauge', measure_payload=True)
     def pressure_gauge():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return go.Figure().update_layout(title="No data available")
-        
+
         # idx = input.datetime_slider()
         idx = selected_index()
-        pressure = df.iloc[idx]['atmospheric_pressure']
-
-        if pd.isna(pressure):
-            return go.Figure().update_layout(title="No temperature data available")
-        
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=pressure,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Pressure (hPa)"},
-            gauge={
-                'axis': {'range': [df['atmospheric_pressure'].min() - 5, df['atmospheric_pressure'].max() + 5]},
-                'bar': {'color': "orange"},
-                'steps': [
-                    {'range': [df['atmospheric_pressure'].min() - 5, 970], 'color': "red"},
-                    {'range': [970, 980], 'color': "yellow"},
-                    {'range': [980, df['atmospheric_pressure'].max() + 5], 'color': "green"},
-                ]
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=70, b=20),
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
         
-        return fig
+        return cached_figure((ds.version, 'pressure_gauge', idx), lambda: pressure_gauge_figure(ds, idx))
     
-    # Wind rose on All tab
+    # Wind rose on All tab: direction x speed frequencies over the chosen period
     @render_widget
+    @timed('wind_rose', measure_payload=True)
     def wind_rose():
-        df = rv.get()
-        if df is None:
+        ds = rv.get()
+        if ds is None:
             return go.Figure().update_layout(title="No data available")
 
         # idx = input.datetime_slider()
         idx = selected_index()
-        wind_dir = df.iloc[idx]['wind_direction']
-        wind_speed = df.iloc[idx]['wind_speed'] if not pd.isna(df.iloc[idx]['wind_speed']) else 0
-        
-        # Map wind directions to angles
-        direction_to_angle = {
-            'north': 0,
-            'northeast': 45,
-            'east': 90,
-            'southeast': 135,
-            'south': 180,
-            'southwest': 225,
-            'west': 270,
-            'northwest': 315
-        }
-        
-        # Default to north if direction is missing
-        angle = direction_to_angle.get(wind_dir.lower() if not pd.isna(wind_dir) else '', 0)
-        
-        # Create wind rose with arrow pointing in direction wind is coming FROM
-        fig = go.Figure()
-        
-        # Add circular background
-        theta = np.linspace(0, 2*np.pi, 100)
-        r = np.ones(100)
-        fig.add_trace(go.Scatterpolar(
-            r=r,
-            theta=np.degrees(theta),
-            mode='lines',
-            line=dict(color='rgba(200, 200, 200, 0.2)'),
-            showlegend=False
-        ))
+        period = input.wind_rose_period()
         
-        # Add cardinal directions
-        for direction, degrees in direction_to_angle.items():
-            fig.add_annotation(
-                x=0.5*np.cos(np.radians(degrees)),
-                y=0.5*np.sin(np.radians(degrees)),
-                text=direction[0].upper(),
-                showarrow=False,
-                xref="x", yref="y",
-                font=dict(size=14, color="white")
+        return cached_figure((ds.version, 'wind_rose', idx, period), lambda: wind_rose_figure(ds, idx, period))
+    
+    # Callback timings for this session and the whole process
+    if DIAGNOSTICS:
+        @output
+        @render.ui
+        def diagnostics_panel():
+            reactive.invalidate_later(2)
+            report = diagnostics_report()
+            
+            def table(metrics):
+                if not metrics:
+                    return ui.p("Nothing recorded yet")
+                frame = pd.DataFrame.from_dict(metrics, orient='index').sort_values('total_ms', ascending=False)
+                frame['mean_ms'] = frame['total_ms'] / frame['runs']
+                return ui.HTML(frame.round(2).to_html(classes="table table-sm"))
+            
+            return ui.div(
+                ui.h4("This session"),
+                table(report['sessions'].get(session.id, {}).get('callbacks', {})),
+                ui.h4(f"All sessions ({len(report['sessions'])} active)"),
+                table(report['process']),
+                ui.p("Machine-readable: /diagnostics.json; per-run log: the 'sangamura.diagnostics' logger")
             )
-        
-        # Add arrow for current wind direction (opposite to meteorological direction)
-        arrow_angle = (angle + 180) % 360  # Wind direction is where it's coming FROM
-        arrow_length = 0.4  # Scale based on wind speed if needed
-        
-        fig.add_annotation(
-            x=arrow_length*np.cos(np.radians(arrow_angle)),
-            y=arrow_length*np.sin(np.radians(arrow_angle)),
-            ax=0, ay=0,
-            xref="x", yref="y",
-            axref="x", ayref="y",
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1.5,
-            arrowwidth=3,
-            arrowcolor="red"
-        )
-        
-        fig.update_layout(
-            title=f"Wind: {wind_dir} at {wind_speed} m/s",
-            showlegend=False,
-            xaxis=dict(
-                range=[-0.6, 0.6],
-                showgrid=False,
-                zeroline=False,
-                showticklabels=False
-            ),
-            yaxis=dict(
-                range=[-0.6, 0.6],
-                showgrid=False,
-                zeroline=False,
-                showticklabels=False
-            ),
-            width=300,
-            height=300,
-            margin=dict(l=0, r=0, t=40, b=0),
-            paper_bgcolor='rgba(0,0,0,0.1)'
-        )
-        
-        return fig
+
+# Headless query API over the same shared datasets the dashboard uses. Endpoints are
+# plain functions, so Starlette runs them in its threadpool rather than on the event loop.
+
+class ApiError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _api_timestamp(request, name, default=None):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        timestamp = pd.Timestamp(value)
+    except ValueError:
+        raise ApiError(f"Invalid timestamp for '{name}': {value}")
+    # Readings are stored in the station's naive local time, which no UTC offset maps onto
+    if timestamp.tzinfo is not None:
+        raise ApiError(f"Timestamp for '{name}' must be station local time without a UTC offset: {value}")
+    return timestamp
+
+def _api_columns(request, available):
+    names = request.query_params.get('columns')
+    if not names:
+        return list(available)
+    columns = names.split(',')
+    unknown = [col for col in columns if col not in available]
+    if unknown:
+        raise ApiError(f"Unknown columns: {', '.join(unknown)}")
+    return columns
+
+# Dataset covering [start, end]: the archive or store window when configured, else the shared
+# generation when one is published, else the default data, as server() picks. Windows need
+# both bounds and are refused before anything is loaded when they hold too many rows.
+def _api_dataset(start=None, end=None):
+    source = get_windowed_source()
+    if source is not None:
+        if start is None or end is None:
+            raise ApiError("Give both 'start' and 'end' when querying an archive or store")
+        try:
+            rows = source.count(start, end)
+        except OSError as e:
+            raise ApiError(f"Error reading archive: {str(e)}", 404)
+        if rows > API_MAX_ROWS:
+            raise ApiError(f"Range holds {rows} rows; narrow it to at most {API_MAX_ROWS}", 413)
+        ds, error = source.load_window(start, end)
+    else:
+        ds, error = shared_dataset() if SHARED_DIR else (None, None)
+        if ds is None:
+            ds, error = load_data()
+    if ds is None:
+        raise ApiError(error, 404)
+    return ds
+
+# Weak ETag from the content identity of the data and the normalised query. Identities are
+# stable across workers and restarts, so the same tag always means the same response.
+def _api_etag(request, identity):
+    query = '&'.join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(f"{identity}\n{request.url.path}?{query}".encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+# Columnar frame as compact JSON ({column: [values]}, datetimes as epoch ms) or an Arrow IPC stream
+def _api_frame_response(request, frame, etag):
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.query_params.get('format', 'json') == 'arrow':
+        if pa is None:
+            raise ApiError("Arrow output needs pyarrow installed", 406)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type='application/vnd.apache.arrow.stream', headers=headers)
+    
+    columns = []
+    for col in frame.columns:
+        values = frame[col]
+        if values.dtype == np.float32 or col.split(':')[0] in NUMERIC_COLS:
+            values = pd.Series(readings(values))
+        columns.append(f"{json.dumps(col)}:{values.to_json(orient='values', date_format='epoch', date_unit='ms', double_precision=15)}")
+    body = '{' + ','.join(columns) + '}'
+    return Response(body, media_type='application/json', headers=headers)
+
+# JSON fallback for the numpy and pandas scalars found in rows and stats
+def _api_scalar(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.floating):
+        value = reading(value)
+        return None if np.isnan(value) else value
+    if isinstance(value, np.generic):
+        value = value.item()
+        return None if isinstance(value, float) and np.isnan(value) else value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+# Summary stats with sensor values as shortest round-tripping readings. Their np.float64 values
+# are floats already, so json.dumps() would never hand them to _api_scalar().
+def _api_stats(stats):
+    def value(v):
+        return None if v is None or pd.isna(v) else reading(v)
+    
+    converted = {}
+    for col, entry in stats.items():
+        if col == 'datetime':
+            converted[col] = {key: v.isoformat() if isinstance(v, pd.Timestamp) else int(v) for key, v in entry.items()}
+            continue
+        converted[col] = {}
+        for key, v in entry.items():
+            if key == 'count':
+                converted[col][key] = int(v)
+            elif key == 'quantiles':
+                converted[col][key] = {q: value(x) for q, x in v.items()}
+            else:
+                converted[col][key] = value(v)
+    return converted
+
+def _api_endpoint(handler):
+    @functools.wraps(handler)
+    def endpoint(request):
+        try:
+            return handler(request)
+        except ApiError as e:
+            return JSONResponse({'error': str(e)}, status_code=e.status_code)
+    return endpoint
+
+def _not_modified(request, etag):
+    return request.headers.get('if-none-match') == etag
+
+# GET /api/range?start=&end=&columns=&format=json|arrow: raw readings in [start, end)
+@_api_endpoint
+def api_range(request):
+    start = _api_timestamp(request, 'start')
+    end = _api_timestamp(request, 'end')
+    ds = _api_dataset(start, end)
+    etag = _api_etag(request, ds.identity)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    lo = 0 if start is None else int(ds.timestamps.searchsorted(start.value))
+    hi = len(ds.timestamps) if end is None else int(ds.timestamps.searchsorted(end.value))
+    if hi - lo > API_MAX_ROWS:
+        raise ApiError(f"Range holds {hi - lo} rows; narrow it to at most {API_MAX_ROWS}", 413)
+    
+    columns = _api_columns(request, [col for col in ds.df.columns if col != 'datetime'])
+    frame = ds.df[['datetime'] + columns].take(ds.order[lo:hi])
+    return _api_frame_response(request, frame, etag)
+
+# GET /api/nearest?t=: the reading closest to a timestamp
+@_api_endpoint
+def api_nearest(request):
+    target = _api_timestamp(request, 't')
+    if target is None:
+        raise ApiError("Missing 't' parameter")
+    ds = _api_dataset(target, target)
+    etag = _api_etag(request, ds.identity)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    row = ds.df.iloc[ds.nearest_index(target)]
+    body = json.dumps({
+        col: None if pd.isna(value) else reading(value) if col in NUMERIC_COLS else value
+        for col, value in row.items()
+    }, default=_api_scalar)
+    return Response(body, media_type='application/json', headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+# GET /api/aggregate?level=hourly|daily|monthly&start=&end=&columns=temperature:mean,...
+@_api_endpoint
+def api_aggregate(request):
+    start = _api_timestamp(request, 'start')
+    end = _api_timestamp(request, 'end')
+    source = get_windowed_source()
+    if isinstance(source, Store):
+        return _store_aggregate(request, source, start, end)
+    
+    ds = _api_dataset(start, end)
+    etag = _api_etag(request, ds.identity)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    levels = {level.name: level for level in ds.rollups()}
+    level = levels.get(request.query_params.get('level', 'daily'))
+    if level is None:
+        raise ApiError(f"Unknown level; use one of {', '.join(levels)}")
+    
+    available = {f"{col}:{agg}": (col, agg) for col, agg in level.values}
+    columns = _api_columns(request, available)
+    lo = 0 if start is None else int(level.timestamps.searchsorted(start.value))
+    hi = len(level.timestamps) if end is None else int(level.timestamps.searchsorted(end.value))
+    
+    frame = pd.DataFrame({'datetime': level.timestamps[lo:hi].view('datetime64[ns]')})
+    for name in columns:
+        frame[name] = level.values[available[name]][lo:hi]
+    return _api_frame_response(request, frame, etag)
+
+# /api/aggregate pushed down to the store, without loading the readings into memory
+def _store_aggregate(request, store, start, end):
+    etag = _api_etag(request, store.identity)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    level = request.query_params.get('level', 'daily')
+    if level not in Store.LEVEL_BUCKETS:
+        raise ApiError(f"Unknown level; use one of {', '.join(Store.LEVEL_BUCKETS)}")
+    
+    available = {f"{col}:{agg}": (col, agg) for col, aggs in ROLLUP_AGGS.items() for agg in aggs if agg in Store.SQL_AGGS}
+    columns = _api_columns(request, available)
+    frame = store.aggregate(start or store.first, end or store.last + pd.Timedelta(1), level,
+                            [available[name] for name in columns])
+    return _api_frame_response(request, frame, etag)
+
+# GET /api/summary: whole-dataset statistics. Over an archive or store they are combined from
+# per-partition stats or computed in SQLite, and carry no quantiles.
+@_api_endpoint
+def api_summary(request):
+    source = get_windowed_source()
+    if source is None:
+        ds = _api_dataset()
+        identity, summarise = ds.identity, lambda: (ds.stats, None)
+    else:
+        try:
+            identity = source.identity
+        except OSError as e:
+            raise ApiError(f"Error reading archive: {str(e)}", 404)
+        summarise = source.summary
+    etag = _api_etag(request, identity)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    
+    stats, error = summarise()
+    if stats is None:
+        raise ApiError(error, 404)
+    body = json.dumps(_api_stats(stats), default=_api_scalar)
+    return Response(body, media_type='application/json', headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+api_routes = [
+    Route("/range", api_range),
+    Route("/nearest", api_nearest),
+    Route("/aggregate", api_aggregate),
+    Route("/summary", api_summary)
+]
 
 # Create app
-app = App(app_ui, server)
\ No newline at end of file
+routes = [Mount("/api", routes=api_routes)]
+
+if DIAGNOSTICS:
+    async def diagnostics_endpoint(request):
+        return JSONResponse(diagnostics_report())
+    
+    routes.append(Route("/diagnostics.json", diagnostics_endpoint))
+
+app = Starlette(routes=routes + [Mount("/", app=App(app_ui, server))])
\ No newline at end of file
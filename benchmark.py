@@ -0,0 +1,185 @@
+"""Benchmarks for the dashboard's ingestion, lookup and render hot paths.
+
+Generates synthetic station CSVs in the same schema as the real exports
+(5-minute readings, 1 month up to 10 years) and times each stage against
+them. Results are printed as a table and can be saved as JSON and compared
+with an earlier run:
+
+    python benchmark.py --sizes 1m,1y --output bench.json
+    python benchmark.py --sizes 1m,1y --compare bench.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SIZES = {
+    '1m': 30,
+    '1y': 365,
+    '10y': 3650
+}
+
+# Write a synthetic station export covering the given number of days
+def generate_csv(path, days, seed=0):
+    rng = np.random.default_rng(seed)
+    stamps = pd.date_range('2024-09-01', periods=days * 288, freq='5min')
+    n = len(stamps)
+    hours = stamps.hour.to_numpy() + stamps.minute.to_numpy() / 60
+
+    rain_5min = np.where(rng.random(n) < 0.03, rng.gamma(0.6, 1.5, n), 0.0).round(1)
+    rain_1hour = pd.Series(rain_5min).rolling(12, min_periods=1).sum().round(1).to_numpy()
+    df = pd.DataFrame({
+        'date': stamps.strftime('%Y/%m/%d'),
+        'time': stamps.strftime('%H:%M'),
+        'temperature': (20 + 6 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 0.5, n)).round(1),
+        'humidity': np.clip(70 - 15 * np.sin((hours - 9) / 24 * 2 * np.pi) + rng.normal(0, 3, n), 0, 100).round(1),
+        'light': np.maximum(0, 50000 * np.sin((hours - 6) / 12 * np.pi)).round(0),
+        'rainfall_5min': rain_5min,
+        'rainfall_1hour': rain_1hour,
+        'wind_speed': rng.gamma(2, 1.2, n).round(1),
+        'wind_direction': rng.choice(
+            ['north', 'northeast', 'east', 'southeast', 'south', 'southwest', 'west', 'northwest'], n
+        ),
+        'atmospheric_pressure': (1005 + np.cumsum(rng.normal(0, 0.05, n)).clip(-30, 30)).round(1)
+    })
+
+    # Real exports have the occasional missing reading
+    gaps = rng.random(n) < 0.001
+    df.loc[gaps, 'temperature'] = np.nan
+    df.to_csv(path, index=False)
+    return n
+
+# (min, median) wall time in milliseconds of repeated calls to fn
+def timeit(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), statistics.median(times)
+
+# Every widget's figure builder, for the first sample of the dataset
+def figure_builders(app, ds):
+    idx = int(ds.order[0])
+    builders = {
+        spec.name.removesuffix('_plot'): functools.partial(app.series_figure, ds, spec)
+        for spec in app.SERIES_SPECS
+    }
+    builders.update({
+        'temperature_gauge': lambda: app.temperature_gauge_figure(ds, idx),
+        'humidity_gauge': lambda: app.humidity_gauge_figure(ds, idx),
+        'pressure_gauge': lambda: app.pressure_gauge_figure(ds, idx),
+        'wind_rose': lambda: app.wind_rose_figure(ds, idx, 'month')
+    })
+    return builders
+
+def run_size(app, label, days, workdir, repeat):
+    path = os.path.join(workdir, f"w771dz_bench_{label}.csv")
+    rows = generate_csv(path, days)
+    results = {'rows': rows, 'csv_bytes': os.path.getsize(path)}
+
+    def reset_caches():
+        app._dataset_cache.clear()
+        app._figure_cache.clear()
+        app._figure_cache_bytes = 0
+
+    # Ingestion: CSV parse (no sidecar), sidecar load, and a shared-cache hit
+    def cold_parse():
+        reset_caches()
+        app._parse_data(path)
+    results['ingest_csv_ms'] = timeit(cold_parse, repeat)
+
+    if app.feather is not None:
+        reset_caches()
+        app.load_data(path)  # Writes the sidecar
+        def sidecar_load():
+            reset_caches()
+            app.load_data(path)
+        results['ingest_sidecar_ms'] = timeit(sidecar_load, repeat)
+
+    reset_caches()
+    ds, error = app.load_data(path)
+    if ds is None:
+        raise RuntimeError(error)
+    results['ingest_cached_ms'] = timeit(lambda: app.load_data(path), repeat)
+    results['memory_bytes'] = int(ds.memory_report().sum())
+
+    # Nearest-timestamp lookup over random targets
+    rng = np.random.default_rng(1)
+    first, last = ds.timestamps[0], ds.timestamps[-1]
+    targets = [pd.Timestamp(int(t)) for t in rng.integers(first, last, 1000)]
+    results['lookup_x1000_ms'] = timeit(lambda: [ds.nearest_index(t) for t in targets], repeat)
+
+    # Derived structures built on first use
+    results['rollups_ms'] = timeit(lambda: app.build_rollups(ds), repeat)
+    day = pd.Timestamp(int(first)).normalize()
+    month = app.wind_rose_window(day, 'month')
+    results['wind_histogram_ms'] = timeit(lambda: app.wind_histogram(ds, *month), repeat)
+
+    # Per-widget figure build and serialized payload size
+    for name, build in figure_builders(app, ds).items():
+        results[f'figure_{name}_ms'] = timeit(lambda: build().to_json(), repeat)
+        results[f'figure_{name}_bytes'] = len(build().to_json())
+
+    return results
+
+def print_report(report, baseline=None):
+    for label, results in report['sizes'].items():
+        print(f"\n== {label}: {results['rows']:,} rows, {results['csv_bytes'] / 2**20:.1f} MB CSV ==")
+        previous = (baseline or {}).get('sizes', {}).get(label, {})
+        for metric, value in results.items():
+            if metric in ('rows', 'csv_bytes'):
+                continue
+            shown = value[1] if isinstance(value, (list, tuple)) else value
+            line = f"  {metric:<36} {shown:>14,.2f}"
+            old = previous.get(metric)
+            if old is not None:
+                old = old[1] if isinstance(old, (list, tuple)) else old
+                if old:
+                    line += f"   {shown / old:6.2f}x vs baseline"
+            print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1m,1y', help=f"comma-separated subset of {','.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=5, help="timed repetitions per measurement")
+    parser.add_argument('--output', help="write the report as JSON to this path")
+    parser.add_argument('--compare', help="JSON report of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep sidecars out of the real data directory
+        os.environ['SANGAMURA_SIDECAR_DIR'] = os.path.join(workdir, 'cache')
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import app
+
+        report = {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'sizes': {}
+        }
+        for label in args.sizes.split(','):
+            report['sizes'][label] = run_size(app, label, SIZES[label], workdir, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
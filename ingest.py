@@ -0,0 +1,55 @@
+"""Bulk ingestion of station exports into one fast-loading Feather file.
+
+Parses every CSV in parallel (one worker process per core by default),
+merges the readings in time order with overlapping timestamps at month
+boundaries deduplicated, and writes the result where the dashboard can load
+it without parsing:
+
+    python ingest.py data/archive/*.csv --output data/w771dz_sangamura.feather
+    SANGAMURA_DATA_PATH=data/w771dz_sangamura.feather shiny run app.py
+
+With --publish the merged readings are also written as a new memory-mapped
+generation that every app worker started with SANGAMURA_SHARED_DIR maps
+read-only, instead of each holding its own copy:
+
+    python ingest.py data/archive/*.csv --publish data/shared
+    SANGAMURA_SHARED_DIR=data/shared uvicorn app:app --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='+', help="station CSV exports to ingest")
+    parser.add_argument('--output', help="Feather file to write the merged readings to")
+    parser.add_argument('--publish', metavar='DIR', help="shared generation directory to publish the merged readings to")
+    parser.add_argument('--processes', type=int, help="worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+    if not args.output and not args.publish:
+        parser.error("give --output, --publish or both")
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app
+
+    start = time.perf_counter()
+    df, error = app.bulk_ingest(args.paths, args.output, args.processes)
+    if df is None:
+        sys.exit(f"Ingest failed: {error}")
+    print(f"Merged {len(df):,} readings from {len(args.paths)} files in {time.perf_counter() - start:.1f}s")
+    if args.output:
+        print(f"Wrote {args.output}")
+
+    if args.publish:
+        try:
+            ds = app.Dataset(df)
+        except ValueError as e:
+            sys.exit(f"Publish failed: {e}")
+        generation, error = app.publish_shared(ds, args.publish)
+        if generation is None:
+            sys.exit(f"Publish failed: {error}")
+        print(f"Published generation {generation} to {args.publish}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+# Three days of 5-minute readings with gaps, missing values and a duplicated timestamp
+def station_frame(rows=3 * 288, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.Timestamp('2024-09-01') + pd.to_timedelta(np.arange(rows) * 5, unit='min')
+    times = times.delete(np.arange(100, 130))  # The station was down for a while
+    df = pd.DataFrame({
+        'datetime': times,
+        'temperature': rng.normal(20, 5, len(times)).round(1),
+        'humidity': rng.uniform(30, 90, len(times)).round(1),
+        'wind_speed': rng.gamma(2, 1.5, len(times)).round(1),
+        'wind_direction': rng.choice(app.WIND_DIRECTIONS + [None], len(times))
+    })
+    df.loc[rng.choice(len(df), 20, replace=False), 'temperature'] = np.nan
+    df.loc[200, 'datetime'] = df.loc[199, 'datetime']
+    return app._typed_frame(df)
+
+# The dataset for head, extended by tail after its derived structures were built
+def extended(head, tail):
+    ds = app.Dataset(head)
+    for col in ('temperature', 'humidity', 'wind_speed'):
+        ds.sorted_values(col)
+    ds.rollups()
+    ds.calendar()
+    return ds.extend(tail)
+
+@pytest.mark.parametrize('shuffled', [False, True])
+@pytest.mark.parametrize('split', [437, 500])  # Mid-hour and mid-day
+def test_extended_rollups_match_full_build(shuffled, split):
+    df = station_frame()
+    head, tail = df.iloc[:split], df.iloc[split:].reset_index(drop=True)
+    if shuffled:
+        head = head.sample(frac=1, random_state=1)
+    head = head.reset_index(drop=True)
+
+    incremental = extended(head, tail).rollups()
+    full = app.build_rollups(app.Dataset(app._concat_chunks([head, tail])))
+    for level, reference in zip(incremental, full):
+        np.testing.assert_array_equal(level.timestamps, reference.timestamps)
+        assert level.values.keys() == reference.values.keys()
+        for key, values in reference.values.items():
+            np.testing.assert_array_equal(level.values[key], values, err_msg=f"{level.name} {key}")
+
+def test_extended_sorted_arrays_and_calendar_match_full_build():
+    df = station_frame()
+    head, tail = df.iloc[:500].reset_index(drop=True), df.iloc[500:].reset_index(drop=True)
+    ds = extended(head, tail)
+    full = app.Dataset(df)
+
+    np.testing.assert_array_equal(ds.timestamps, full.timestamps)
+    for col in ('temperature', 'humidity', 'wind_speed'):
+        np.testing.assert_array_equal(ds.sorted_values(col), full.sorted_values(col))
+    np.testing.assert_array_equal(ds.sorted_directions(), full.sorted_directions())
+    np.testing.assert_array_equal(ds.calendar().days, full.calendar().days)
+    np.testing.assert_array_equal(ds.calendar().bounds, full.calendar().bounds)
+
+def test_merge_summary_matches_summarize():
+    df = station_frame()
+    head, tail = df.iloc[:500].reset_index(drop=True), df.iloc[500:].reset_index(drop=True)
+    ds = app.Dataset(head)
+    full = app.Dataset(df)
+
+    stats, daily = app.merge_summary(ds.stats, ds.daily_stats, tail, full.timestamps)
+    for col in ('temperature', 'humidity', 'wind_speed'):
+        assert stats[col]['min'] == full.stats[col]['min']
+        assert stats[col]['max'] == full.stats[col]['max']
+        assert stats[col]['count'] == full.stats[col]['count']
+        assert stats[col]['mean'] == pytest.approx(full.stats[col]['mean'], rel=1e-12)
+        assert stats[col]['quantiles'] == ds.stats[col]['quantiles']  # Kept from the last full summary
+    assert stats['datetime'] == full.stats['datetime']
+    pd.testing.assert_frame_equal(daily, full.daily_stats, check_dtype=False, rtol=1e-12)
+
+def test_nearest_index_matches_idxmin():
+    df = station_frame().sample(frac=1, random_state=2).reset_index(drop=True)
+    df.loc[5, 'datetime'] = pd.NaT
+    ds = app.Dataset(df)
+
+    timestamps = df['datetime'].dropna()
+    targets = list(timestamps.sample(50, random_state=3))
+    targets += [t + pd.Timedelta(minutes=2.5) for t in targets]  # Exactly between two samples
+    targets += [timestamps.min() - pd.Timedelta(days=1), timestamps.max() + pd.Timedelta(days=1),
+                pd.Timestamp('2024-09-01 09:00')]  # Before, after and inside the outage
+    for target in targets:
+        assert ds.nearest_index(target) == (df['datetime'] - target).abs().idxmin(), target
+
+def test_parse_date_time_matches_string_parse():
+    rng = np.random.default_rng(4)
+    days = pd.date_range('2023-12-30', periods=5).strftime('%Y/%m/%d')
+    clocks = pd.date_range('2024-01-01', periods=288, freq='5min').strftime('%H:%M')
+    dates = pd.Series(rng.choice(days, 1000), dtype=object)
+    times = pd.Series(rng.choice(clocks, 1000), dtype=object)
+    dates[[3, 10]] = np.nan
+    times[[10, 20]] = np.nan
+
+    parsed = app._parse_date_time(dates, times)
+    reference = pd.to_datetime(dates + ' ' + times, format='%Y/%m/%d %H:%M')
+    np.testing.assert_array_equal(parsed.to_numpy().view('int64'),
+                                  reference.to_numpy(dtype='datetime64[ns]').view('int64'))